@@ -33,6 +33,7 @@ Add a description of the plugin (to be presented to the user inside the wizard)
 here.  This should describe *what* the plugin does.
 """
 
+import sys
 import supybot
 import supybot.world as world
 from importlib import reload
@@ -53,10 +54,12 @@ __contributors__ = {
 # This is a url where the most recent plugin package can be downloaded.
 __url__ = 'https://launchpad.net/ubuntu-bots'
 
-from . import config
-reload(config)
-from . import plugin
-reload(plugin) # In case we're being reloaded.
+_reloading = f"{__name__}.plugin" in sys.modules
+from . import config  # noqa: E402
+from . import plugin  # noqa: E402
+if _reloading: # In case we're being reloaded.
+    reload(config)
+    reload(plugin)
 # Add more reloads here if you add third-party modules and want them to be
 # reloaded when this plugin is reloaded.  Don't forget to import them as well!
 
@@ -42,11 +42,14 @@ import re
 import types
 
 from importlib import reload
-from . import meeting
-from . import writers
-
-reload(meeting)
-reload(writers)
+# Only reload when the plugin is being reloaded, not on first import.
+_reloading = f"{__package__}.meeting" in sys.modules
+from . import meeting  # noqa: E402
+from . import writers  # noqa: E402
+
+if _reloading:
+    reload(meeting)
+    reload(writers)
 
 
 def configure(advanced):
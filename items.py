@@ -30,31 +30,87 @@
 
 from __future__ import annotations
 from . import writers
+import operator
+import re
+import sys
 import time
-from typing import Any, Optional, Tuple, TypeVar, TYPE_CHECKING, Union
+from typing import Any, Callable, Iterable, Optional, Tuple, TYPE_CHECKING, Union
 if TYPE_CHECKING:
     from .meeting import Meeting
-    from _typeshed import SupportsDivMod
 
-
-    _T_contra = TypeVar("_T_contra", contravariant=True)
-    _T_co = TypeVar("_T_co", covariant=True)
     _TimeTuple = Tuple[int, int, int, int, int, int, int, int, int]
 
+# Note on performance: everything here is short-string work (replace,
+# strftime, %-formatting), which is exactly what JIT compilers like Numba
+# do worse than CPython -- unicode support falls back to object mode and
+# pays seconds of compile time.  Don't JIT this module; keep speedups to
+# plain Python (__slots__, precompiled templates, caches).
+
 
-def inbase(i: SupportsDivMod[_T_contra@divmod, _T_co@divmod], chars: str = 'abcdefghijklmnopqrstuvwxyz', place: int = 0) -> str:
+def inbase(i: int, chars: str = 'abcdefghijklmnopqrstuvwxyz') -> str:
     """Converts an integer into a postfix in base 26 using ascii chars.
 
     This is used to make a unique postfix for ReStructured Text URL
-    references, which must be unique.  (Yes, this is over-engineering,
-    but keeps it short and nicely arranged, and I want practice
-    writing recursive functions.)
+    references, which must be unique.
+    """
+    base = len(chars)
+    digits = []
+    while True:
+        i, mod = divmod(i, base)
+        digits.append(chars[mod])
+        if i == 0:
+            return ''.join(reversed(digits))
+
+
+_timeCache: dict[Tuple[int, int], str] = {}
+
+
+def formatTime(time_: Union[_TimeTuple, time.struct_time]) -> str:
+    """Return the HH:MM form of a time tuple.
+
+    Many lines share the same minute, so the strftime results are cached
+    by (hour, minute).
     """
-    div, mod = divmod(i, len(chars)**(place+1))
-    if div == 0:
-        return chars[mod]
-    else:
-        return inbase(div, chars=chars, place=place+1)+chars[mod]
+    key = (time_[3], time_[4])
+    formatted = _timeCache.get(key)
+    if formatted is None:
+        formatted = _timeCache[key] = sys.intern(time.strftime("%H:%M", time_))
+    return formatted
+
+
+# Doublequotes have to be escaped for URLs put in href="..." attributes.
+urlQuoteTable = str.maketrans({'"': '%22'})
+
+templateKeyRE = re.compile(r'%\((\w+)\)s')
+
+
+def compileTemplate(template: str) -> Callable[[dict[str, Any]], str]:
+    """Turn a %(name)s style template into a callable taking a dict.
+
+    The named placeholders are rewritten to positional %s ones and the
+    values are pulled out of the dict with a single itemgetter, which
+    avoids the per-key lookups of dict-based %-formatting.
+    """
+    keys = templateKeyRE.findall(template)
+    fmt = templateKeyRE.sub('%s', template)
+    if not keys:
+        return lambda repl: fmt % ()
+    getter = operator.itemgetter(*keys)
+    if len(keys) == 1:
+        return lambda repl: fmt % (getter(repl),)
+    return lambda repl: fmt % getter(repl)
+
+
+# Output formats items can be rendered in, mapped to the attribute
+# holding that format's compiled template.  Each format is escaped with
+# the function of the same name in the writers module.
+renderFormats = {
+    'html': 'html_template_fn',
+    'rst': 'rst_template_fn',
+    'text': 'text_template_fn',
+    'mw': 'mw_template_fn',
+    'moin': 'moin_template_fn',
+}
 
 #
 # These are objects which we can add to the meeting minutes.  Mainly
@@ -64,6 +120,8 @@ def inbase(i: SupportsDivMod[_T_contra@divmod, _T_co@divmod], chars: str = 'abcd
 
 class _BaseItem(object):
     itemtype: Optional[str] = None
+    __slots__ = ('nick', 'linenum', 'anchor', 'time', 'rstref',
+                 '_escapedNick', '_baseRepl')
     starthtml = ''
     endhtml = ''
     startrst = ''
@@ -75,31 +133,88 @@ class _BaseItem(object):
     startmoin = ''
     endmoin = ''
 
-    def get_replacements(self, M: Meeting, escapewith: Union[writers.html, writers.moin, writers.mw, writers.rst, writers.text]) -> dict[str, Any]:
-        replacements: dict[str, Any] = {}
-        for name in dir(self):
-            if name[0] == "_":
+    # Attributes made available to the output templates as they are.
+    # Subclasses extend this with the fields they set in __init__.
+    _REPL_FIELDS: Tuple[str, ...] = ('itemtype', 'time', 'linenum', 'anchor')
+    # User-supplied text attributes, escaped for each output format.
+    _ESCAPED_FIELDS: Tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        """Precompile the output templates of each item class."""
+        super().__init_subclass__(**kwargs)
+        for fmt, attr in renderFormats.items():
+            template = getattr(cls, f'{fmt}_template', None)
+            if template is None:
                 continue
-            replacements[name] = getattr(self, name)
-        replacements['nick'] = escapewith(replacements['nick'])
+            # The start/end markup is fixed per class, so put it straight
+            # into the template instead of passing it in every render.
+            for marker in (f'start{fmt}', f'end{fmt}'):
+                value = getattr(cls, marker).replace('%', '%%')
+                template = template.replace(f'%({marker})s', value)
+            setattr(cls, attr, staticmethod(compileTemplate(template)))
+
+    def _baseReplacements(self) -> dict[str, Any]:
+        """The replacements which don't depend on the output format."""
+        base = getattr(self, '_baseRepl', None)
+        if base is None:
+            base = self._baseRepl = {name: getattr(self, name)
+                                     for name in self._REPL_FIELDS}
+        return base
+
+    def get_replacements(self, M: Meeting, escapewith: Union[writers.html, writers.moin, writers.mw, writers.rst, writers.text]) -> dict[str, Any]:
+        replacements = dict(self._baseReplacements())
+        # The nick is the same for every output format of an item, so
+        # only escape it once per escaping function.
+        nick = self._escapedNick.get(escapewith)
+        if nick is None:
+            nick = self._escapedNick[escapewith] = escapewith(self.nick)
+        replacements['nick'] = nick
         replacements['link'] = self.logURL(M)
-        if 'line' in replacements:
-            replacements['line'] = escapewith(replacements['line'])
-        if 'topic' in replacements:
-            replacements['topic'] = escapewith(replacements['topic'])
+        # rstref only exists once rst() has been called
+        if hasattr(self, 'rstref'):
+            replacements['rstref'] = self.rstref
+        for name in self._ESCAPED_FIELDS:
+            replacements[name] = escapewith(getattr(self, name))
+        # An empty topic would leave a bare '****' in reST.
+        if (escapewith is writers.rst and 'topic' in replacements
+                and not replacements['topic']):
+            replacements['topic'] = ' '
         if 'url' in replacements:
-            replacements['url_quoteescaped'] = \
-                escapewith(self.url.replace('"', "%22"))
+            if escapewith is writers.html:
+                # special: replace doublequote only for the URL.
+                replacements['url'] = replacements['url_quoteescaped'] = \
+                    self._htmlURL
+                replacements['url_readable'] = self._htmlURLReadable
+            else:
+                replacements['url_quoteescaped'] = \
+                    escapewith(self._quotedURL)
         return replacements
 
+    def render(self, M: Meeting, fmt: str) -> str:
+        """Render this item in one of the formats in renderFormats."""
+        if fmt == 'rst':
+            self.rstref = self.makeRSTref(M)
+        # Looked up here rather than stored in the table, so that
+        # reloading the writers module is picked up.
+        escapewith = getattr(writers, fmt)
+        repl = self.get_replacements(M, escapewith=escapewith)
+        return getattr(self, renderFormats[fmt])(repl)
+
     def template(self, M: Meeting, escapewith: Union[writers.html, writers.moin, writers.mw, writers.rst, writers.text]) -> dict[str, Any]:
-        template: dict[str, Any] = {}
-        for k, v in self.get_replacements(M, escapewith).items():
-            if k not in ('itemtype', 'line', 'topic',
-                         'url', 'url_quoteescaped',
-                         'nick', 'time', 'link', 'anchor'):
-                continue
-            template[k] = v
+        template: dict[str, Any] = {
+            'itemtype': self.itemtype,
+            'nick': escapewith(self.nick),
+            'time': self.time,
+            'link': self.logURL(M),
+            'anchor': self.anchor,
+        }
+        for name in ('line', 'topic'):
+            if hasattr(self, name):
+                template[name] = escapewith(getattr(self, name))
+        if hasattr(self, 'url'):
+            template['url'] = self.url
+            template['url_quoteescaped'] = \
+                escapewith(self._quotedURL)
         return template
 
     def makeRSTref(self, M: Meeting):
@@ -107,25 +222,28 @@ class _BaseItem(object):
             rstref = rstref_orig = "%s%s" % (self.nick, self.time)
         else:
             rstref = rstref_orig = "%s-%s" % (self.nick, self.time)
-        count = 0
-        while rstref in M.rst_refs:
-            rstref = rstref_orig + inbase(count)
-            count += 1
+        # M.rst_refs counts how often each nick/time pair has been used.
+        # Suffixed refs end in a letter and plain ones in a digit, so
+        # they can't collide with each other.
+        count = M.rst_refs.get(rstref_orig, 0)
+        if count:
+            rstref = rstref_orig + inbase(count - 1)
+        M.rst_refs[rstref_orig] = count + 1
         link = self.logURL(M)
-        M.rst_urls.append(".. _%s: %s" % (rstref, f"{link}#{self.anchor}"))
-        M.rst_refs[rstref] = True
+        M.rst_urls.append((rstref, link, self.anchor))
         return rstref
 
-    @property
-    def anchor(self) -> str:
-        return 'l-%d' % self.linenum
-
     def logURL(self, M: Meeting):
-        return f"{M.config.basename}.log.html"
+        # Meeting.save() caches this while the writers run.
+        url = getattr(M, '_logURL', None)
+        if url is None:
+            url = f"{M.config.basename}.log.html"
+        return url
 
 
 class Topic(_BaseItem):
     itemtype = 'TOPIC'
+    __slots__ = ('topic',)
     html_template = ("""%(starthtml)s%(topic)s%(endhtml)s """
                       """<span class="details">"""
                       """(%(nick)s, """
@@ -145,45 +263,20 @@ class Topic(_BaseItem):
     endhtml = '</b>'
     startmoin = '=== '
     endmoin = ' ==='
+    _ESCAPED_FIELDS = ('topic',)
 
     def __init__(self, nick: str, line: str, linenum: int, time_: Union[_TimeTuple, time.struct_time]):
         self.nick = nick
+        self._escapedNick: dict[Callable[[str], str], str] = {}
         self.topic = line
         self.linenum = linenum
-        self.time = time.strftime("%H:%M", time_)
-
-    def _htmlrepl(self, M: Meeting):
-        repl = self.get_replacements(M, escapewith=writers.html)
-        repl['link'] = self.logURL(M)
-        return repl
-
-    def html(self, M: Meeting):
-        return self.html_template % self._htmlrepl(M)
-
-    def rst(self, M: Meeting):
-        self.rstref = self.makeRSTref(M)
-        repl = self.get_replacements(M, escapewith=writers.rst)
-        if repl['topic'] == '':
-            repl['topic'] = ' '
-        repl['link'] = self.logURL(M)
-        return self.rst_template % repl
-
-    def text(self, M: Meeting):
-        repl = self.get_replacements(M, escapewith=writers.text)
-        repl['link'] = self.logURL(M)
-        return self.text_template % repl
-
-    def mw(self, M: Meeting):
-        repl = self.get_replacements(M, escapewith=writers.mw)
-        return self.mw_template % repl
-
-    def moin(self, M: Meeting):
-        repl = self.get_replacements(M, escapewith=writers.moin)
-        return self.moin_template % repl
+        self.anchor = f'l-{linenum}'
+        self.time = formatTime(time_)
 
 
 class Subtopic(Topic):
     itemtype = 'SUBTOPIC'
+    __slots__ = ()
     moin_template = """%(startmoin)s%(topic)s%(endmoin)s  (%(nick)s, %(time)s)"""
     starthtml = '<b class="SUBTOPIC">'
     endhtml = '</b>'
@@ -193,6 +286,7 @@ class Subtopic(Topic):
 
 class GenericItem(_BaseItem):
     itemtype = ''
+    __slots__ = ('line',)
     # html_template = ("""<i>%(itemtype)s</i>: %(starthtml)s%(line)s%(endhtml)s """
     #                  """(%(nick)s, <a href='%(link)s#%(anchor)s'>%(time)s</a>)""")
     html_template = ("""<i class="itemtype">%(itemtype)s</i>: """
@@ -206,43 +300,20 @@ class GenericItem(_BaseItem):
     text_template = """%(itemtype)s: %(starttext)s%(line)s%(endtext)s  (%(nick)s, %(time)s)"""
     mw_template = """''%(itemtype)s:'' %(startmw)s%(line)s%(endmw)s  (%(nick)s, %(time)s)"""
     moin_template = """''%(itemtype)s:'' %(startmoin)s%(line)s%(endmoin)s  (%(nick)s, %(time)s)"""
+    _ESCAPED_FIELDS = ('line',)
 
     def __init__(self, nick: str, line: str, linenum: int, time_: Union[_TimeTuple, time.struct_time]):
         self.nick = nick
+        self._escapedNick: dict[Callable[[str], str], str] = {}
         self.line = line
         self.linenum = linenum
-        self.time = time.strftime("%H:%M", time_)
-
-    def _htmlrepl(self, M: Meeting):
-        repl = self.get_replacements(M, escapewith=writers.html)
-        repl['link'] = self.logURL(M)
-        return repl
-
-    def html(self, M: Meeting):
-        return self.html_template % self._htmlrepl(M)
-
-    def rst(self, M: Meeting):
-        self.rstref = self.makeRSTref(M)
-        repl = self.get_replacements(M, escapewith=writers.rst)
-        repl['link'] = self.logURL(M)
-        return self.rst_template % repl
-
-    def text(self, M: Meeting):
-        repl = self.get_replacements(M, escapewith=writers.text)
-        repl['link'] = self.logURL(M)
-        return self.text_template % repl
-
-    def mw(self, M: Meeting):
-        repl = self.get_replacements(M, escapewith=writers.mw)
-        return self.mw_template % repl
-
-    def moin(self, M: Meeting):
-        repl = self.get_replacements(M, escapewith=writers.moin)
-        return self.moin_template % repl
+        self.anchor = f'l-{linenum}'
+        self.time = formatTime(time_)
 
 
 class Info(GenericItem):
     itemtype = 'INFO'
+    __slots__ = ()
     html_template = ("""<span class="%(itemtype)s">"""
                       """%(starthtml)s%(line)s%(endhtml)s</span> """
                       """<span class="details">"""
@@ -257,42 +328,51 @@ class Info(GenericItem):
 
 class Idea(GenericItem):
     itemtype = 'IDEA'
+    __slots__ = ()
 
 
 class Agreed(GenericItem):
     itemtype = 'AGREED'
+    __slots__ = ()
 
 
 class Action(GenericItem):
     itemtype = 'ACTION'
+    __slots__ = ()
 
 
 class Help(GenericItem):
     itemtype = 'HELP'
+    __slots__ = ()
 
 
 class Done(GenericItem):
     itemtype = 'DONE'
+    __slots__ = ()
 
 
 class Vote(GenericItem):
     itemtype = 'VOTE'
+    __slots__ = ()
 
 
 class Accepted(GenericItem):
     itemtype = 'ACCEPTED'
+    __slots__ = ()
     starthtml = '<span class="text-success">'
     endhtml = '</span>'
 
 
 class Rejected(GenericItem):
     itemtype = 'REJECTED'
+    __slots__ = ()
     starthtml = '<span class="text-danger">'
     endhtml = '</span>'
 
 
 class Link(_BaseItem):
     itemtype = 'LINK'
+    __slots__ = ('line', 'url', '_quotedURL', '_htmlURL', '_htmlURLReadable')
     # html_template = ("""<i>%(itemtype)s</i>: %(starthtml)s<a href="%(url)s">%(url_readable)s</a> %(line)s%(endhtml)s """
     #                  """(%(nick)s, <a href='%(link)s#%(anchor)s'>%(time)s</a>)""")
     # html_template = ("""<i>%(itemtype)s</i>: %(starthtml)s<a href="%(url)s">%(url_readable)s</a> %(line)s%(endhtml)s """
@@ -306,43 +386,35 @@ class Link(_BaseItem):
     text_template = """%(itemtype)s: %(starttext)s%(url)s %(line)s%(endtext)s  (%(nick)s, %(time)s)"""
     mw_template = """''%(itemtype)s:'' %(startmw)s%(url)s %(line)s%(endmw)s  (%(nick)s, %(time)s)"""
     moin_template = """''%(itemtype)s:'' %(startmoin)s%(url)s %(line)s%(endmoin)s  (%(nick)s, %(time)s)"""
+    _REPL_FIELDS = _BaseItem._REPL_FIELDS + ('url',)
+    _ESCAPED_FIELDS = ('line',)
 
     def __init__(self, nick: str, line: str, linenum: int, time_: Union[_TimeTuple, time.struct_time]):
         self.nick = nick
+        self._escapedNick: dict[Callable[[str], str], str] = {}
         self.linenum = linenum
-        self.time = time.strftime("%H:%M", time_)
-        self.url, self.line = (line+' ').split(' ', 1)
-        # URL sanitization
-        self.url_readable = self.url  # readable line version
-        self.line = self.line.rstrip()
-
-    def _htmlrepl(self, M: Meeting):
-        repl = self.get_replacements(M, escapewith=writers.html)
-        # special: replace doublequote only for the URL.
-        repl['url'] = writers.html(self.url.replace('"', "%22"))
-        repl['url_readable'] = writers.html(self.url)
-        repl['link'] = self.logURL(M)
-        return repl
-
-    def html(self, M: Meeting):
-        return self.html_template % self._htmlrepl(M)
-
-    def rst(self, M: Meeting):
-        self.rstref = self.makeRSTref(M)
-        repl = self.get_replacements(M, escapewith=writers.rst)
-        repl['link'] = self.logURL(M)
-        #repl['url'] = writers.rst(self.url)
-        return self.rst_template % repl
-
-    def text(self, M: Meeting):
-        repl = self.get_replacements(M, escapewith=writers.text)
-        repl['link'] = self.logURL(M)
-        return self.text_template % repl
-
-    def mw(self, M: Meeting):
-        repl = self.get_replacements(M, escapewith=writers.mw)
-        return self.mw_template % repl
-
-    def moin(self, M: Meeting):
-        repl = self.get_replacements(M, escapewith=writers.moin)
-        return self.moin_template % repl
+        self.anchor = f'l-{linenum}'
+        self.time = formatTime(time_)
+        self.url, _, line = line.partition(' ')
+        # URL sanitization, done once as the URL never changes
+        self._quotedURL = self.url.translate(urlQuoteTable)
+        self._htmlURL = writers.html(self._quotedURL)
+        self._htmlURLReadable = writers.html(self.url)  # readable line version
+        self.line = line.rstrip()
+
+
+def escapeNicks(minutes: Iterable[_BaseItem], escapewith: Callable[[str], str]):
+    """Escape the nicks of a whole list of items in one pass.
+
+    A meeting has far fewer speakers than minute items, so each distinct
+    nick is escaped once and the result shared by all of its items.
+    """
+    escaped: dict[str, str] = {}
+    for m in minutes:
+        cache = m._escapedNick
+        if escapewith in cache:
+            continue
+        nick = escaped.get(m.nick)
+        if nick is None:
+            nick = escaped[m.nick] = escapewith(m.nick)
+        cache[escapewith] = nick
@@ -28,23 +28,95 @@
 # POSSIBILITY OF SUCH DAMAGE.
 ###
 
-from io import TextIOWrapper
-from typing import Any, Callable, Optional, Union
+from typing import Any, BinaryIO, Callable, Optional, Union
 from . import __version__
 import os
 import sys
 import re
 import time
 import stat
+import functools
+from collections import Counter
+from datetime import datetime, timezone, tzinfo
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from supybot import utils, log as supylog
 
 from importlib import reload
 from . import config
 from . import writers
 from .writers import Writers
-from . import items
+# Only reload items if it was already loaded, i.e. when the plugin is
+# being reloaded; a first import has just executed it anyway.
+_reloadItems = f"{__package__}.items" in sys.modules
+from . import items  # noqa: E402
+
+if _reloadItems:
+    reload(items)
+
+# tzinfo for each timeZone setting seen so far.
+_timeZones: dict[str, tzinfo] = {}
+
+
+def timeZoneInfo(name: str) -> tzinfo:
+    """The tzinfo for a timeZone setting.
+
+    Unknown names fall back to UTC, as they do for the TZ variable.
+    """
+    tz = _timeZones.get(name)
+    if tz is None:
+        try:
+            tz = ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError):
+            tz = timezone.utc
+        _timeZones[name] = tz
+    return tz
+
+
+# Log timestamps repeat for every line in the same minute (or second),
+# so replays mostly hit the cache.
+@functools.lru_cache(maxsize=4096)
+def parseLogTime(time_: str) -> Optional[time.struct_time]:
+    """Parse a replayed log's HH:MM or HH:MM:SS timestamp.
+
+    Gives the same result as time.strptime() with those formats (None
+    if neither matches), without strptime's slow generic parser.
+    """
+    fields = time_.split(':')
+    if not 2 <= len(fields) <= 3:
+        return None
+    for field in fields:
+        if not (1 <= len(field) <= 2 and field.isascii() and field.isdigit()):
+            return None
+    hour, minute = int(fields[0]), int(fields[1])
+    second = int(fields[2]) if len(fields) == 3 else 0
+    if hour > 23 or minute > 59 or second > 61:
+        return None
+    return time.struct_time((1900, 1, 1, hour, minute, second, 0, 1, -1))
+
+
+# Lines starting with one of these are votes (see doCastVote).
+castVote_RE = re.compile(r'([+-]1|[+-]?0)\b')
+
+
+def voteValue(vote: str) -> str:
+    """Classify a vote as '+1', '-1' or '0', or '' if it is none of them.
+
+    Equivalent to matching r'([+-]1|[+-]?0)\b' but without a regex.
+    """
+    sign = vote[:1]
+    if sign in ('+', '-'):
+        digit, after = vote[1:2], vote[2:3]
+    else:
+        sign, digit, after = '', sign, vote[1:2]
+    # \b after the digit: the next character must not be a word character
+    if after and (after.isalnum() or after == '_'):
+        return ''
+    if digit == '0':
+        return '0'
+    if digit == '1' and sign:
+        return sign + '1'
+    return ''
 
-reload(items)
 
 Items = Union[items.Accepted, items.Action, items.Agreed, items.Done, items.GenericItem, items.Help, items.Idea, items.Link, items.Rejected, items.Subtopic, items.Topic, items.Vote]
 
@@ -65,8 +137,7 @@ class MeetingCommands(object):
         if not getattr(self, "starttime", None):
             self.starttime = time_
         repl = self.replacements()
-        message = self.config.startMeetingMessage % repl
-        for messageline in message.split('\n'):
+        for messageline in self.config.messageLines('startMeetingMessage', repl):
             self.reply(messageline)
         self.do_private_commands(self.owner)
         for chair in self.chairs:
@@ -82,7 +153,7 @@ class MeetingCommands(object):
         # Close any open votes
         if self.activeVote:
             endVoteKwargs = {"linenum": kwargs.get("linenum", "0"),
-                             "time_": time.localtime()}
+                             "time_": self.localtime()}
             self.do_endvote(nick=nick, line=line, **endVoteKwargs)
         self.topic(self.oldtopic)
         self.endtime = time_
@@ -174,30 +245,24 @@ class MeetingCommands(object):
         """Add a chair to the meeting."""
         if not self.isChair(nick):
             return
-        for chair in re.split('[, ]+', line):
-            if not chair:
-                continue
+        for chair in map(sys.intern, line.replace(',', ' ').split()):
             if chair not in self.chairs:
                 if self._channelNicks and chair not in self._channelNicks():
                     self.reply("Warning: '%s' not in channel" % chair)
                 self.addnick(chair, lines=0)
-                self.chairs[chair] = True
+                self.chairs.add(chair)
                 self.do_private_commands(chair)
-        current_chairs = ', '.join(
-            sorted(set(list(self.chairs.keys()) + [self.owner])))
+        current_chairs = ', '.join(sorted(self.chairs | {self.owner}))
         self.reply(f"Current chairs: {current_chairs}")
 
     def do_unchair(self, nick: str, line: str, **kwargs):
         """Remove a chair from the meeting (founder cannot be removed)."""
         if not self.isChair(nick):
             return
-        for chair in re.split('[, ]+', line):
-            if not chair:
-                continue
+        for chair in line.replace(',', ' ').split():
             if chair in self.chairs:
-                del self.chairs[chair]
-        current_chairs = ', '.join(
-            sorted(set(list(self.chairs.keys()) + [self.owner])))
+                self.chairs.remove(chair)
+        current_chairs = ', '.join(sorted(self.chairs | {self.owner}))
         self.reply(f"Current chairs: {current_chairs}")
 
     def do_undo(self, nick: str, **kwargs):
@@ -209,6 +274,7 @@ class MeetingCommands(object):
         self.reply("Removing item from minutes: %s" %
                    self.minutes[-1].itemtype)
         del self.minutes[-1]
+        self._minutesByType = None
 
     def do_restrictlogs(self, nick: str, **kwargs):
         """When saved, remove permissions from the files."""
@@ -281,16 +347,10 @@ class MeetingCommands(object):
 
         self.reply(f"Voting ended on: {self.activeVote}")
         # should probably just store the summary of the results
-        vfor = 0
-        vagainst = 0
-        vabstain = 0
-        for v in self.currentVote.values():
-            if re.match(r'\+1\b', v):
-                vfor += 1
-            elif re.match(r'-1\b', v):
-                vagainst += 1
-            elif re.match(r'[+-]?0\b', v):
-                vabstain += 1
+        tally = Counter(voteValue(v) for v in self.currentVote.values())
+        vfor = tally['+1']
+        vagainst = tally['-1']
+        vabstain = tally['0']
 
         self.reply("Votes for: %d, Votes against: %d, Abstentions: %d" %
                    (vfor, vagainst, vabstain))
@@ -326,26 +386,41 @@ class MeetingCommands(object):
             return
         """Provide a list of authorised voters."""
         # possibly should provide a means to change voters to everyone
-        for voter in re.split('[, ]+', line):
-            if not voter:
-                continue
+        for voter in map(sys.intern, line.replace(',', ' ').split()):
             if voter in ('everyone', 'everybody', 'all'):
                 # clear the voter list
-                self.voters = {}
+                self.voters = set()
                 self.reply("Everyone can now vote")
                 return
             if voter not in self.voters:
                 if self._channelNicks and voter not in self._channelNicks():
                     self.reply("Warning: '%s' not in channel" % voter)
                 self.addnick(voter, lines=0)
-                self.voters[voter] = True
-        current_voters = sorted(set(list(self.voters.keys()) + [self.owner]))
-        self.reply(f"Current voters: {', '.join(current_voters)}")
+                self.voters.add(voter)
+        current_voters = ', '.join(sorted(self.voters | {self.owner}))
+        self.reply(f"Current voters: {current_voters}")
 
     def do_private_commands(self, nick: str, **kwargs):
-        commands = sorted(["#"+x[3:] for x in dir(self) if x[:3] == "do_"])
-        message = f"Available commands: {', '.join(commands)}"
-        self.privateReply(nick, message)
+        self.privateReply(nick, self._privateCommandsMessage())
+
+    @classmethod
+    def _privateCommandsMessage(cls) -> str:
+        # The do_* methods are fixed per class, so only list them once.
+        message = cls.__dict__.get('_privateCommandsMsg')
+        if message is None:
+            commands = sorted(["#"+x[3:] for x in dir(cls) if x[:3] == "do_"])
+            message = f"Available commands: {', '.join(commands)}"
+            cls._privateCommandsMsg = message
+        return message
+
+    @classmethod
+    def _commandHandlers(cls) -> dict[str, Callable[..., Any]]:
+        # command name -> do_* function, also fixed per class.
+        handlers = cls.__dict__.get('_commandHandlerMap')
+        if handlers is None:
+            handlers = {x[3:]: getattr(cls, x) for x in dir(cls) if x[:3] == "do_"}
+            cls._commandHandlerMap = handlers
+        return handlers
 
     # Commands for anyone
     def do_action(self, **kwargs):
@@ -387,10 +462,7 @@ class MeetingCommands(object):
         """Make meetbot aware of a nick which hasn't said anything.
 
         To see where this can be used, see the #action command."""
-        nicks = re.split('[, ]+', line)
-        for nick in nicks:
-            if not nick:
-                continue
+        for nick in line.replace(',', ' ').split():
             self.addnick(nick, lines=0)
 
     def do_link(self, **kwargs):
@@ -400,15 +472,20 @@ class MeetingCommands(object):
         if self.config.beNoisy:
             self.reply(f"URI ADDED: {m.line}")
 
+    _publicCommandsMsg = "Available commands: %s" % ', '.join(sorted(
+        ["action", "info", "idea", "nick", "link", "commands"]))
+
     def do_commands(self, **kwargs):
-        commands = sorted(
-            ["action", "info", "idea", "nick", "link", "commands"])
-        self.reply(f"Available commands: {', '.join(commands)}")
+        self.reply(self._publicCommandsMsg)
 
 
 class Meeting(MeetingCommands, object):
     _lurk = False
     _restrictlogs = False
+    _logURL: Optional[str] = None
+    _replaying = False
+    _lastRealtimeSave: Optional[float] = None
+    _realtimeDirty = False
 
     def __init__(self, channel: str, owner: str, botIsOp: Optional[bool] = False, botNick: Optional[str] = '', oldtopic: Optional[str] = '',
                  filename: Optional[str] = None, writeRawLog: Optional[bool] = False,
@@ -442,9 +519,16 @@ class Meeting(MeetingCommands, object):
         self.oldtopic = oldtopic
         self.lines = []
         self.minutes: list[Items] = []
-        self.attendees: dict[str, int] = {}
-        self.chairs = {}
-        self.voters = {}
+        # The minutes bucketed by itemtype, built by the writers and
+        # cleared whenever the minutes change.
+        self._minutesByType: Optional[dict[str, list[Items]]] = None
+        self.attendees: Counter[str] = Counter()
+        # The attendees sorted by line count and by nick, built by the
+        # writers and cleared by addnick.
+        self._nickCounts: Optional[list[tuple[str, int]]] = None
+        self._sortedNicks: Optional[list[str]] = None
+        self.chairs: set[str] = set()
+        self.voters: set[str] = set()
         self.publicVoters = {}
         self.votes = {}
         self.votesrequired = 0
@@ -452,32 +536,52 @@ class Meeting(MeetingCommands, object):
         self._writeRawLog = writeRawLog
         self._meetingTopic = None
         self._meetingname = ""
+        self._clockTimes: dict[str, tuple[time.struct_time, str]] = {}
         self._meetingIsOver = False
         self._channelNicks = channelNicks
         if filename:
             self._filename = filename
 
-        # Set the timezone
-        os.environ['TZ'] = self.config.timeZone
-        time.tzset()
+    def localtime(self) -> time.struct_time:
+        """The current time in this meeting's timeZone."""
+        now = datetime.now(timeZoneInfo(self.config.timeZone))
+        # timetuple() leaves tm_zone/tm_gmtoff unset (and tm_isdst -1
+        # for fixed offsets), which would make %Z/%z in filenamePattern
+        # and the messages show UTC rather than the timeZone.
+        return time.struct_time((*now.timetuple()[:8], 1 if now.dst() else 0,
+                                 now.tzname(),
+                                 int(now.utcoffset().total_seconds())))
 
     # These commands are callbacks to manipulate the IRC protocol.
     # Set self._sendReply and self._setTopic to a callback to do these things.
+    # Without one, the class defaults below only log what would be sent.
+    @staticmethod
+    def _sendReply(x: str):
+        supylog.debug("REPLY: %s" % x)
+
+    @staticmethod
+    def _sendPrivateReply(nick: str, x: str):
+        pass
+
+    @staticmethod
+    def _setTopic(x: str):
+        supylog.debug("TOPIC: %s" % x)
+
     def reply(self, x: str):
         """Send a reply to the channel."""
-        if hasattr(self, '_sendReply') and not self._lurk:
+        if not self._lurk:
             self._sendReply(x)
         else:
             supylog.debug("REPLY: %s" % x)
 
     def privateReply(self, nick: str, x: str):
         """Send a reply to a nick."""
-        if hasattr(self, '_sendPrivateReply') and not self._lurk:
+        if not self._lurk:
             self._sendPrivateReply(nick, x)
 
     def topic(self, x: str):
         """Set the topic in the channel."""
-        if hasattr(self, '_setTopic') and not self._lurk and self.botIsOp:
+        if not self._lurk and self.botIsOp:
             self._setTopic(x)
         else:
             supylog.debug("TOPIC: %s" % x)
@@ -498,7 +602,10 @@ class Meeting(MeetingCommands, object):
     def addnick(self, nick: str, lines: int = 1):
         """This person has spoken, lines=<how many lines>"""
         if nick != self.botNick:
-            self.attendees[nick] = self.attendees.get(nick, 0) + lines
+            if nick not in self.attendees:
+                self._sortedNicks = None
+            self.attendees[nick] += lines
+            self._nickCounts = None
 
     def isChair(self, nick: str):
         """Is the nick a chair?"""
@@ -508,12 +615,11 @@ class Meeting(MeetingCommands, object):
         """The remaining meeting end bits."""
         self.config.save()
         repl = self.replacements()
-        message = self.config.endMeetingMessage % repl
-        for messageline in message.split('\n'):
+        for messageline in self.config.messageLines('endMeetingMessage', repl):
             self.reply(messageline)
+        notification = self.config.endMeetingNotification % repl
         for nickToPM in self.config.endMeetingNotificationList:
-            self.privateReply(
-                nickToPM, self.config.endMeetingNotification % repl)
+            self.privateReply(nickToPM, notification)
 
     def replay(self, url: str):
         """Begin a replay."""
@@ -524,11 +630,39 @@ class Meeting(MeetingCommands, object):
     def save(self, **kwargs):
         return self.config.save(**kwargs)
 
+    def realtimeSave(self):
+        """Update the realtime outputs (the raw log) after a new line.
+
+        Saves happen at most once every realtimeSaveMinInterval seconds;
+        lines arriving in between are written out by the next save or
+        by flushRealtime().
+        """
+        if self._replaying:
+            return
+        now = time.monotonic()
+        if (self._lastRealtimeSave is not None and
+                now - self._lastRealtimeSave < self.config.realtimeSaveMinInterval):
+            self._realtimeDirty = True
+            return
+        self._lastRealtimeSave = now
+        self._realtimeDirty = False
+        self.save(realtime_update=True)
+
+    def flushRealtime(self):
+        """Write out lines held back by realtimeSave(), if there are any."""
+        if self._realtimeDirty and not self._meetingIsOver:
+            self._lastRealtimeSave = time.monotonic()
+            self._realtimeDirty = False
+            self.save(realtime_update=True)
+
     # Primary entry point for new lines in the log
     def addline(self, nick: str, line: str, isop: bool = False, time_: time.struct_time = None):
         """This is the way to add lines to the Meeting object."""
+        # Share one string per nick between the log, attendees, items
+        # and votes instead of keeping a copy per message.
+        nick = sys.intern(nick)
         if not time_:
-            time_ = time.localtime()
+            time_ = self.localtime()
         linenum = self.addrawline(nick, line, time_)
         self.isop = isop
         # Handle any commands given in the line
@@ -537,16 +671,18 @@ class Meeting(MeetingCommands, object):
             command, line = matchobj.groups('')
             command = command.lower()
             # to define new commands, define a method do_commandname
-            if hasattr(self, f"do_{command}"):
-                getattr(self, f"do_{command}")(nick=nick, line=line,
-                                               linenum=linenum, time_=time_)
+            handler = self._commandHandlers().get(command)
+            if handler is not None:
+                handler(self, nick=nick, line=line,
+                        linenum=linenum, time_=time_)
         else:
             # Detect URLs automatically
-            if line.split('//')[0] in self.config.UrlProtocols:
+            if line.startswith(self.config.urlPrefixes()):
                 self.do_link(nick=nick, line=line,
                              linenum=linenum, time_=time_)
-        self.save(realtime_update=True)
-        if re.match(r'([+-]1|[+-]?0)\b', line):
+        self.realtimeSave()
+        # doCastVote ignores everything while no vote is open.
+        if self.activeVote and castVote_RE.match(line):
             self.doCastVote(nick, line, time_)
 
     def doCastVote(self, nick: str, line: str, time_=None, private: bool = False):
@@ -568,20 +704,20 @@ class Meeting(MeetingCommands, object):
 
     def addrawline(self, nick: str, line: str, time_=None):
         """This adds a line to the log, bypassing command execution."""
+        nick = sys.intern(nick)
         self.addnick(nick)
-        line = line.strip('\x01')  # \x01 is present in ACTIONs
+        if '\x01' in line:
+            line = line.strip('\x01')  # \x01 is present in ACTIONs
         # Setting a custom time is useful when replaying logs,
         # otherwise use our current time
         if not time_:
-            time_ = time.localtime()
+            time_ = self.localtime()
 
         # Handle the logging of the line
         if line[:6] == 'ACTION':
-            logline = "%s * %s %s" % (time.strftime("%H:%M", time_),
-                                      nick, line[7:].lstrip())
+            logline = f"{items.formatTime(time_)} * {nick} {line[7:].lstrip()}"
         else:
-            logline = "%s <%s> %s" % (time.strftime("%H:%M", time_),
-                                      nick, line)
+            logline = f"{items.formatTime(time_)} <{nick}> {line}"
         self.lines.append(logline)
         linenum = len(self.lines)
         return linenum
@@ -589,6 +725,7 @@ class Meeting(MeetingCommands, object):
     def additem(self, m: Items):
         """Add an item to the meeting minutes list."""
         self.minutes.append(m)
+        self._minutesByType = None
 
     def replacements(self):
         repl = {
@@ -608,39 +745,59 @@ class Meeting(MeetingCommands, object):
             if "meeting" not in self._meetingTopic.lower():
                 repl['meeting'] += ' meeting'
         if getattr(self, "starttime", None):
-            repl['starttime'] = time.strftime("%H:%M:%S", self.starttime)
+            repl['starttime'] = self._clockTime('starttime')
         if getattr(self, "endtime", None):
-            repl['endtime'] = time.strftime("%H:%M:%S", self.endtime)
+            repl['endtime'] = self._clockTime('endtime')
         return repl
 
+    def _clockTime(self, attr: str) -> str:
+        """starttime/endtime as HH:MM:SS, formatted once per value."""
+        value = getattr(self, attr)
+        cached = self._clockTimes.get(attr)
+        if cached is None or cached[0] is not value:
+            cached = self._clockTimes[attr] = (
+                value, time.strftime("%H:%M:%S", value))
+        return cached[1]
+
     def process_meeting(self, content: str, dontSave: bool = False):
-        def parse_time(time_):
-            try:
-                return time.strptime(time_, "%H:%M")
-            except ValueError:
-                pass
-            try:
-                return time.strptime(time_, "%H:%M:%S")
-            except ValueError:
-                pass
         if dontSave:
             self.config.dontSave = True
-        # process all lines
-        for line in content.split('\n'):
-            # match regular spoken lines
-            m = self.config.logline_RE.match(line)
-            if m:
-                time_ = parse_time(m.group(1))
-                nick = m.group(2)
-                line = m.group(3)
-                self.addline(nick, line, time_=time_)
-            # match /me lines
-            m = self.config.loglineAction_RE.match(line)
-            if m:
-                time_ = parse_time(m.group(1))
-                nick = m.group(2)
-                line = m.group(3)
-                self.addline(nick, f"ACTION {line}", time_=time_)
+        loglineRE, actionGroup = self.config.loglineParser()
+        # Don't update the realtime outputs for every replayed line,
+        # only once at the end.
+        self._replaying = True
+        try:
+            # process all lines
+            for line in content.split('\n'):
+                m = loglineRE.match(line)
+                if not m:
+                    continue
+                if m.lastindex < actionGroup:
+                    # regular spoken line
+                    time_, nick, line = m.group(1, 2, 3)
+                else:
+                    # /me line
+                    time_, nick, line = m.group(
+                        actionGroup, actionGroup + 1, actionGroup + 2)
+                    line = f"ACTION {line}"
+                self.addline(nick, line, time_=parseLogTime(time_))
+        finally:
+            self._replaying = False
+        if not self._meetingIsOver:
+            self.save(realtime_update=True)
+
+
+class LazyWriters(dict):
+    """Writers by extension, each only instantiated when first used."""
+
+    def __init__(self, M: Meeting, factories: dict[str, type[Writers]]):
+        super().__init__()
+        self.M = M
+        self.factories = factories
+
+    def __missing__(self, extension: str) -> Writers:
+        writer = self[extension] = self.factories[extension](self.M)
+        return writer
 
 
 class Config(object):
@@ -664,7 +821,9 @@ class Config(object):
     # Used to detect #link
     UrlProtocols = ['http:', 'https:', 'irc:', 'ftp:', 'mailto:', 'ssh:']
     # Regular expression for parsing commands.
-    command_RE = re.compile(r'^#(\w+)(?:\s+(.*?)|)\s*$')
+    # (.*\S rather than a lazy .*? keeps long lines from being retried
+    # against \s*$ at every character.)
+    command_RE = re.compile(r'^#(\w+)(?:\s+(.*\S)|)\s*$')
     # Regular expressions for parsing loglines.
     logline_RE = re.compile(
         r'^\[?([0-9:]+)\]?\s*<[@%&+ ]?([^>]+)>\s*(.*?)\s*$')
@@ -675,8 +834,8 @@ class Config(object):
     # HTML irc log highlighting style.  `pygmentize -L styles` to list.
     pygmentizeStyle = 'friendly'
     # Timezone setting.  You can use friendly names like 'US/Eastern', etc.
-    # Check /usr/share/zoneinfo/ or `man timezone`; this is the content
-    # of the TZ environment variable.
+    # Check /usr/share/zoneinfo/ or `man timezone`; any IANA time zone
+    # name works.
     timeZone = 'UTC'
     # These are the start and end meeting messages, respectively.
     # Some replacements are done before they are used, using the
@@ -701,6 +860,8 @@ class Config(object):
 
     # Write out select logfiles
     update_realtime = True
+    # Minimum number of seconds between two realtime updates
+    realtimeSaveMinInterval = 2.0
     # CSS configs
     cssFile_log = 'default'
     cssEmbed_log = False
@@ -725,16 +886,38 @@ class Config(object):
         self.M = M
         self.writeRawLog = writeRawLog
         self.safeMode = safeMode
+        # filename -> number of M.lines in it, for append-only writers
+        self._writtenLines: dict[str, int] = {}
         # Update config values with anything we may have
         for k, v in extraConfig.items():
             setattr(self, k, v)
 
     def setWriters(self):
-        self.writers: dict[str, Writers] = {}
+        factories: dict[str, type[Writers]] = {}
         if self.writeRawLog:
-            self.writers['.log.txt'] = writers.TextLog(self.M)
-        for extension, writer in self.writer_map.items():
-            self.writers[extension] = writer(self.M)
+            factories['.log.txt'] = writers.TextLog
+        factories.update(self.writer_map)
+        self.writers = LazyWriters(self.M, factories)
+        # We want to write the rawlog (.log.txt) first in case the
+        # other methods break.  That way, we have saved enough to
+        # replay.
+        self._writerOrder = list(factories)
+        if '.log.txt' in factories:
+            self._writerOrder.remove('.log.txt')
+            self._writerOrder.insert(0, '.log.txt')
+        # Parse embedded arguments ('.ext|name=value|...') once.
+        self._writerArgs: dict[str, tuple[str, dict[str, str]]] = {}
+        for key in factories:
+            if '|' in key:
+                extension, args = key.split('|', 1)
+                self._writerArgs[key] = (
+                    extension, dict(a.split('=', 1) for a in args.split('|')))
+            else:
+                self._writerArgs[key] = (key, {})
+        # Writers which say they should be updated step-by-step.
+        self._realtimeExtensions = frozenset(
+            extension for extension, writer in factories.items()
+            if getattr(writer, 'update_realtime', False))
 
     def filename(self, url: bool = False) -> str:
         # provide a way to override the filename.  If it is
@@ -742,6 +925,27 @@ class Config(object):
         # work.):
         if getattr(self.M, '_filename', None):
             return self.M._filename
+        path = self._relativeFilename()
+        # If we want the URL name, append URL prefix and return
+        if url:
+            return os.path.join(self.logUrlPrefix, path)
+        # This is called on every save; reuse the full path (and skip
+        # the directory check) until the relative path or logFileDir
+        # change.
+        logFileDir = self.logFileDir
+        cached = getattr(self, '_fullFilename', None)
+        if cached is not None and cached[0] is path and cached[1] == logFileDir:
+            return cached[2]
+        fullpath = os.path.join(logFileDir, path)
+        # make directory if it doesn't exist...
+        dirname = os.path.dirname(fullpath)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        self._fullFilename = (path, logFileDir, fullpath)
+        return fullpath
+
+    def _relativeFilename(self) -> str:
+        """The filename pattern filled in for this meeting."""
         # names useful for pathname formatting.
         # Certain test channels always get the same name - don't need
         # file prolifiration for them
@@ -749,6 +953,12 @@ class Config(object):
             pattern = self.specialChannelFilenamePattern
         else:
             pattern = self.filenamePattern
+        # The path only changes with #meetingname (or a registry change
+        # of the pattern), so only build it again when one of them does.
+        key = (pattern, self.M._meetingname, self.M.starttime)
+        cached = getattr(self, '_filenamePath', None)
+        if cached is not None and cached[0] == key:
+            return cached[1]
         channel = self.M.channel.strip('# ').lower().replace('/', '')
         network = self.M.network.strip(' ').lower().replace('/', '')
         if self.M._meetingname:
@@ -758,19 +968,54 @@ class Config(object):
         path = pattern % {'channel': channel, 'network': network,
                           'meetingname': meetingname}
         path = time.strftime(path, self.M.starttime)
-        # If we want the URL name, append URL prefix and return
-        if url:
-            return os.path.join(self.logUrlPrefix, path)
-        path = os.path.join(self.logFileDir, path)
-        # make directory if it doesn't exist...
-        dirname = os.path.dirname(path)
-        if not url and dirname and not os.access(dirname, os.F_OK):
-            os.makedirs(dirname)
+        self._filenamePath = (key, path)
         return path
 
+    def urlPrefixes(self) -> tuple[str, ...]:
+        """UrlProtocols as 'proto://' prefixes, ready for str.startswith."""
+        protocols = self.UrlProtocols
+        cached = getattr(self, '_urlPrefixes', None)
+        # UrlProtocols can be changed at runtime through the registry.
+        if cached is None or cached[0] is not protocols:
+            cached = self._urlPrefixes = (
+                protocols, tuple(f"{p}//" for p in protocols))
+        return cached[1]
+
+    def messageLines(self, name: str, repl: dict[str, Any]) -> list[str]:
+        """Format the message template `name`, one entry per IRC message."""
+        template = getattr(self, name)
+        cache = getattr(self, '_messageLines', None)
+        if cache is None:
+            cache = self._messageLines = {}
+        cached = cache.get(name)
+        # The templates can be changed at runtime through the registry.
+        if cached is None or cached[0] != template:
+            cached = cache[name] = (template, template.split('\n'))
+        return [line % repl for line in cached[1]]
+
+    def loglineParser(self) -> tuple[re.Pattern, int]:
+        """logline_RE and loglineAction_RE combined into one regex.
+
+        Returns the regex and the number of the first loglineAction_RE
+        group in it, so each replayed line is only matched once.
+        """
+        regexes = (self.logline_RE, self.loglineAction_RE)
+        cached = getattr(self, '_loglineParser', None)
+        # Both regexes can be changed at runtime through the registry.
+        if cached is None or cached[0] != regexes:
+            combined = re.compile(
+                f"(?:{regexes[0].pattern})|(?:{regexes[1].pattern})",
+                regexes[0].flags | regexes[1].flags)
+            cached = self._loglineParser = (
+                regexes, (combined, regexes[0].groups + 1))
+        return cached[1]
+
     @property
     def basename(self) -> str:
-        return os.path.basename(self.M.config.filename())
+        # Same as the basename of filename(), without touching the disk.
+        if getattr(self.M, '_filename', None):
+            return os.path.basename(self.M._filename)
+        return os.path.basename(self.M.config._relativeFilename())
 
     def save(self, realtime_update: bool = False):
         """Write all output files.
@@ -781,68 +1026,103 @@ class Config(object):
         if realtime_update and not hasattr(self.M, 'starttime'):
             return
         rawname = self.filename()
-        # We want to write the rawlog (.log.txt) first in case the
-        # other methods break.  That way, we have saved enough to
-        # replay.
         if not hasattr(self, 'writers'):
             self.setWriters()
-        writer_names = list(self.writers.keys())
         results = {}
-        if '.log.txt' in writer_names:
-            writer_names.remove('.log.txt')
-            writer_names.insert(0, '.log.txt')
-        for extension in writer_names:
-            writer = self.writers[extension]
-            # Why this?  If this is a realtime (step-by-step) update,
-            # then we only want to update those writers which say they
-            # should be updated step-by-step.
-            if (realtime_update and (not self.update_realtime or
-                                     not getattr(writer, 'update_realtime', False) or
-                                     getattr(self, '_filename', None))
-                ):
-                continue
-            # Parse embedded arguments
-            if '|' in extension:
-                extension, args = extension.split('|', 1)
-                args = args.split('|')
-                args = dict([a.split('=', 1) for a in args])
+        # Why this?  If this is a realtime (step-by-step) update,
+        # then we only want to update those writers which say they
+        # should be updated step-by-step.  This is decided from the
+        # writer classes, so writers that are skipped aren't built yet.
+        if realtime_update:
+            if self.update_realtime and not getattr(self, '_filename', None):
+                realtimeExtensions = self._realtimeExtensions
             else:
-                args = {}
-
-            text = writer.format(extension, **args)
-            results[extension] = text
-            # If the writer returns a string or unicode object, then
-            # we should write it to a filename with that extension.
-            # If it doesn't, then it's assumed that the write took
-            # care of writing (or publishing or emailing or wikifying)
-            # it itself.
-            if isinstance(text, str):
-                # Have a way to override saving, so no disk files are written.
-                if getattr(self, "dontSave", False):
+                realtimeExtensions = frozenset()
+        # Have a way to override saving, so no disk files are written.
+        dontSave = getattr(self, "dontSave", False)
+        # Every minute item links back to the log, so work out its
+        # URL once for this save rather than once per rendered item.
+        self.M._logURL = f"{os.path.basename(rawname)}.log.html"
+        try:
+            for key in self._writerOrder:
+                if realtime_update and key not in realtimeExtensions:
+                    continue
+                writer = self.writers[key]
+                extension, args = self._writerArgs[key]
+
+                filename = f"{rawname}{extension}"
+                # Append-only outputs (the raw log) only need the lines
+                # added since the last time they were written.
+                written = self._writtenLines.get(filename)
+                if realtime_update and written is not None and not dontSave:
+                    self.writeToFile(writer.formatSince(written), filename,
+                                     append=True)
+                    self._writtenLines[filename] = len(self.M.lines)
                     continue
-                self.writeToFile(text, f"{rawname}{extension}")
+
+                text = writer.format(extension, **args)
+                results[extension] = text
+                # If the writer returns a string or bytes object, then
+                # we should write it to a filename with that extension.
+                # If it doesn't, then it's assumed that the write took
+                # care of writing (or publishing or emailing or wikifying)
+                # it itself.
+                if isinstance(text, (str, bytes)):
+                    if dontSave:
+                        continue
+                    self.writeToFile(text, filename)
+                    if hasattr(writer, 'formatSince'):
+                        self._writtenLines[filename] = len(self.M.lines)
+        finally:
+            self.M._logURL = None
         return results
 
-    def writeToFile(self, string: str, filename: str):
-        """Write a given string to a file."""
+    def writeToFile(self, string: Union[str, bytes], filename: str, append: bool = False):
+        """Write a given string to a file, or append it to the file.
+
+        Writers that produce their output already encoded (such as
+        HTMLfromReST) can pass bytes, which are written as they are.
+        """
         # The reason we have this method just for this is to proxy
         # through the _restrictPermissions logic.
-        with open(filename, 'w') as f:
+        # Encode up front and write the bytes in one go, rather than
+        # through a text-mode wrapper.
+        if isinstance(string, str):
+            data = string.encode(self.output_codec)
+        else:
+            data = string
+        mode = 0o666
+        if self.M._restrictlogs:
+            # New files are created without those permissions already.
+            mode &= ~self.RestrictPerm
+        flags = os.O_WRONLY | os.O_CREAT
+        flags |= os.O_APPEND if append else os.O_TRUNC
+        fd = os.open(filename, flags, mode)
+        # Unbuffered: the data is already complete, so hand it straight
+        # to write() (which may take it in more than one piece).
+        with open(fd, 'wb', buffering=0) as f:
             if self.M._restrictlogs:
                 self.restrictPermissions(f)
-            f.write(string)
+            view = memoryview(data)
+            while view:
+                view = view[f.write(view):]
 
-    def restrictPermissions(self, f: TextIOWrapper):
+    def restrictPermissions(self, f: BinaryIO):
         """Remove the permissions given in the variable RestrictPerm."""
-        f.flush()
-        newmode = os.stat(f.name).st_mode & (~self.RestrictPerm)
-        os.chmod(f.name, newmode)
+        # Through the open file, so there's no path lookup or race with
+        # the file being replaced.
+        fd = f.fileno()
+        newmode = os.fstat(fd).st_mode & (~self.RestrictPerm)
+        os.fchmod(fd, newmode)
 
 
 # Load local configuration
 try:
+    # As with items above, only reload it when the plugin is reloaded.
+    _reloadLocalConfig = f"{__package__}.meetingLocalConfig" in sys.modules
     from . import meetingLocalConfig
-    meetingLocalConfig = reload(meetingLocalConfig)
+    if _reloadLocalConfig:
+        meetingLocalConfig = reload(meetingLocalConfig)
     if hasattr(meetingLocalConfig, 'Config'):
         Config = type('Config', (meetingLocalConfig.Config, Config), {})
 except ImportError:
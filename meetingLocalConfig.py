@@ -18,4 +18,4 @@ class Config(object):
         # '.moin.txt': writers.Moin,
         # '.mw.txt': writers.MediaWiki,
     }
-    command_RE = re.compile(r'^[#\[](\w+)\]?(?:\s+(.*?)|)\s*$')
+    command_RE = re.compile(r'^[#\[](\w+)\]?(?:\s+(.*\S)|)\s*$')
@@ -29,24 +29,36 @@
 ###
 
 from typing import Union
-from supybot import utils, plugins, ircutils, callbacks, ircmsgs, irclib, log as supylog
+from supybot import utils, plugins, ircutils, callbacks, ircmsgs, irclib, schedule, log as supylog
 from supybot.commands import *
 
 import re
 import time
+from collections import deque
 from . import meeting
 
 # By doing this, we can not lose all of our meetings across plugin
 # reloads.  But, of course, you can't change the source too
 # drastically if you do that!
-try:
-    meeting_cache
-except NameError:
-    meeting_cache: dict[tuple[str, str], meeting.Meeting] = {}
-try:
-    recent_meetings
-except NameError:
-    recent_meetings: list[tuple[str, str, str]] = []
+meeting_cache: dict[tuple[str, str], meeting.Meeting] = globals().get(
+    'meeting_cache', {})
+recent_meetings: deque[tuple[str, str, str]] = deque(
+    globals().get('recent_meetings', ()), maxlen=10)
+
+# Channel and start time from the URL of a log given to #replay.
+logfile_RE = re.compile(
+    r'^.*/([^.]+)\.([0-9]{4}(-[0-9]{2}){3}(\.[0-9]{2}){1,2})\..*$')
+
+
+def parseLogfileTime(time_: str):
+    try:
+        return time.strptime(time_, "%Y-%m-%d-%H.%M")
+    except ValueError:
+        pass
+    try:
+        return time.strptime(time_, "%Y-%m-%d-%H.%M.%S")
+    except ValueError:
+        pass
 
 
 class Irc(callbacks.ReplyIrcProxy, irclib.Irc):
@@ -63,6 +75,22 @@ class MeetBot(callbacks.Plugin):
     def __init__(self, irc):
         self.__parent = super(MeetBot, self)
         self.__parent.__init__(irc)
+        # Realtime saves are throttled; write out whatever was held back
+        # once the channel goes quiet.
+        schedule.addPeriodicEvent(self._flushRealtime,
+                                  meeting.Config.realtimeSaveMinInterval,
+                                  name='MeetBot.flushRealtime', now=False)
+
+    def die(self):
+        try:
+            schedule.removePeriodicEvent('MeetBot.flushRealtime')
+        except KeyError:
+            pass
+        self.__parent.die()
+
+    def _flushRealtime(self):
+        for M in list(meeting_cache.values()):
+            M.flushRealtime()
 
     # Instead of using real Supybot commands, I just listen to ALL
     # messages coming in and respond to those beginning with our
@@ -77,6 +105,16 @@ class MeetBot(callbacks.Plugin):
         channel: str = msg.channel
         network: str = irc.network
         payload: str = msg.args[1].strip()
+
+        # Get our Meeting object, if one exists.  Have to keep track
+        # of different servers/channels.
+        # (channel, network) tuple is our lookup key.
+        Mkey = (channel, network)
+        M = meeting_cache.get(Mkey, None)
+        # Without a meeting only #startmeeting and #replay matter, so
+        # skip everything below for the usual chat line.
+        if M is None and payload[:1] != '#':
+            return
         chanState: irclib.ChannelState = irc.state.channels[channel]
 
         # These callbacks are used to send data to the channel
@@ -97,19 +135,6 @@ class MeetBot(callbacks.Plugin):
             return (nick == M.owner or nick in M.chairs or
                     chanState.isOp(nick))
 
-        logfile_RE = re.compile(
-            r'^.*/([^.]+)\.([0-9]{4}(-[0-9]{2}){3}(\.[0-9]{2}){1,2})\..*$')
-
-        def parse_time(time_: str):
-            try:
-                return time.strptime(time_, "%Y-%m-%d-%H.%M")
-            except ValueError:
-                pass
-            try:
-                return time.strptime(time_, "%Y-%m-%d-%H.%M.%S")
-            except ValueError:
-                pass
-
         # The following is for debugging.  It's excellent to get an
         # interactive interperter inside of the live bot.  use
         # code.interact instead of my souped-up version if you aren't
@@ -117,14 +142,11 @@ class MeetBot(callbacks.Plugin):
         # if payload == 'interact':
         #    from rkddp.interact import interact ; interact()
 
-        # Get our Meeting object, if one exists.  Have to keep track
-        # of different servers/channels.
-        # (channel, network) tuple is our lookup key.
-        Mkey = (channel, network)
-        M = meeting_cache.get(Mkey, None)
-
+        # Only lines starting with '#' can be one of the commands below,
+        # so only lowercase (the start of) those.
+        command = payload[:13].lower() if payload[:1] == '#' else ''
         # Start meeting if we are requested
-        if payload[:13].lower() == '#startmeeting':
+        if command == '#startmeeting':
             if M:
                 irc.error("Can't start another meeting, one is in progress",
                           private=True)
@@ -142,10 +164,8 @@ class MeetBot(callbacks.Plugin):
             meeting_cache[Mkey] = M
             recent_meetings.append(
                 (channel, network, time.ctime()))
-            if len(recent_meetings) > 10:
-                del recent_meetings[0]
         # Replay meeting
-        elif payload[:7].lower() == '#replay':
+        elif command[:7] == '#replay':
             if M:
                 irc.error("Can't replay logs while a meeting is in progress",
                           private=True)
@@ -159,14 +179,12 @@ class MeetBot(callbacks.Plugin):
             meeting_cache[Mkey] = M
             recent_meetings.append(
                 (channel, network, time.ctime()))
-            if len(recent_meetings) > 10:
-                del recent_meetings[0]
             url = payload[7:].strip().split()[0]
             if url:
                 m = logfile_RE.match(url)
                 if m:
                     M.channel = f"#{m.group(1)}"
-                    M.starttime = parse_time(m.group(2))
+                    M.starttime = parseLogfileTime(m.group(2))
                 M.replay(url)
                 if not M._meetingIsOver:
                     M._setTopic = _setTopic
@@ -177,15 +195,15 @@ class MeetBot(callbacks.Plugin):
                     del meeting_cache[Mkey]
             return
         # End meeting on issues with saving the logs
-        elif payload[:11].lower() == '#endmeeting' \
+        elif command[:11] == '#endmeeting' \
                 and M and M._meetingIsOver and isChair(nick):
             M.endmeeting()
             del meeting_cache[Mkey]
-        elif payload[:13].lower() == '#abortmeeting' \
+        elif command == '#abortmeeting' \
                 and M and isChair(nick):
             if not M._meetingIsOver:
                 M.topic(M.oldtopic)
-                M.endtime = time.localtime()
+                M.endtime = M.localtime()
                 M._meetingIsOver = True
             del meeting_cache[Mkey]
             irc.reply("Meeting ended without saving its logs")
@@ -210,18 +228,18 @@ class MeetBot(callbacks.Plugin):
         nick = msg.nick
 
         """ private voting system """
-        if not msg.channel and re.match(r'([+-]1|[+-]?0)\b', vote):
-            for key in meeting_cache.keys():
-                if channel == key[0]:
-                    voteMeeting = meeting_cache.get(key, None)
-                    if voteMeeting:
-                        time_ = time.localtime()
-                        private = True
-                        voteMeeting.doCastVote(nick, vote, time_, private)
-                        irc.reply(
-                            f"Received for vote: {voteMeeting.activeVote}")
-                    else:
-                        irc.reply("No active meetings in this channel")
+        if not msg.channel and meeting.castVote_RE.match(vote):
+            # Meetings are keyed by (channel, network); look it up
+            # directly rather than scanning every meeting.
+            voteMeeting = meeting_cache.get((channel, irc.network), None)
+            if voteMeeting:
+                time_ = voteMeeting.localtime()
+                private = True
+                voteMeeting.doCastVote(nick, vote, time_, private)
+                irc.reply(
+                    f"Received for vote: {voteMeeting.activeVote}")
+            else:
+                irc.reply("No active meetings in this channel")
     vote = wrap(vote, ["something", "channel"])
 
     def outFilter(self, irc: Irc, msg: ircmsgs.IrcMsg):
@@ -264,11 +282,12 @@ class MeetBot(callbacks.Plugin):
         """
 
         Save all currently active meetings."""
-        for M in meeting_cache.items():
+        meetings = list(meeting_cache.values())
+        for M in meetings:
             if not M._meetingIsOver:
-                M.endtime = time.localtime()
+                M.endtime = M.localtime()
             M.config.save()
-        irc.reply("Saved %d meetings" % len(meeting_cache.items()))
+        irc.reply("Saved %d meetings" % len(meetings))
     savemeetings = wrap(savemeetings, ['admin'])
 
     def addchair(self, irc: Irc, msg: ircmsgs.IrcMsg, args: list[str], channel: str, network: str, nick: str):
@@ -281,7 +300,7 @@ class MeetBot(callbacks.Plugin):
             irc.reply("Meeting on channel %s, network %s not found" % (
                 channel, network))
             return
-        M.chairs.setdefault(nick, True)
+        M.chairs.add(nick)
         irc.reply("Chair added: %s on (%s, %s)" % (nick, channel, network))
     addchair = wrap(addchair, ['admin', "channel", "something", "nick"])
 
@@ -298,7 +317,7 @@ class MeetBot(callbacks.Plugin):
         if save:
             M = meeting_cache[Mkey]
             if not M._meetingIsOver:
-                M.endtime = time.localtime()
+                M.endtime = M.localtime()
             M.config.save()
         del meeting_cache[Mkey]
         irc.reply("Deleted meeting on (%s, %s)" % (channel, network))
@@ -345,16 +364,31 @@ class MeetBot(callbacks.Plugin):
                        "We don't want to go wasting people's times looking for why they are pinged."))
             return
 
-        # ping all nicks in lines of about 256
-        nickline = ''
+        # ping all nicks in as few lines as fit IRC's 512 byte limit.
+        # The server relays each line as ":<our hostmask> PRIVMSG
+        # <channel> :<nicks>\r\n", so leave room for all of that.  If
+        # our hostmask isn't known yet, assume the longest usual one
+        # (10 character user, 63 character host).
+        try:
+            hostmask = irc.state.nickToHostmask(irc.nick)
+        except KeyError:
+            hostmask = f"{irc.nick}!{'u' * 10}@{'h' * 63}"
+        budget = 512 - len(f":{hostmask} PRIVMSG {channel} :".encode()) - 2
         chanState: irclib.ChannelState = irc.state.channels[channel]
-        nicks: list[str] = sorted(chanState.users, key=lambda x: x.lower())
+        nicks: list[str] = sorted(chanState.users, key=str.lower)
+        nickline: list[str] = []
+        length = 0
         for nick in nicks:
-            nickline += nick + ' '
-            if len(nickline) > 256:
-                irc.queueMsg(ircmsgs.privmsg(channel, nickline))
-                nickline = ''
-        irc.queueMsg(ircmsgs.privmsg(channel, nickline))
+            size = len(nick.encode())
+            if nickline and length + size > budget:
+                irc.queueMsg(ircmsgs.privmsg(channel, ' '.join(nickline)))
+                nickline = []
+                length = 0
+            nickline.append(nick)
+            # the nick plus the space joining it to the next one
+            length += size + 1
+        if nickline:
+            irc.queueMsg(ircmsgs.privmsg(channel, ' '.join(nickline)))
         # Send announcement message
         irc.queueMsg(ircmsgs.privmsg(channel, message))
     pingall = wrap(pingall, [optional('text', None)])
@@ -0,0 +1,132 @@
+from .. import writers
+from .. import meeting
+import os
+import re
+import unittest
+
+os.environ['MEETBOT_RUNNING_TESTS'] = '1'
+
+testdir = os.path.dirname(os.path.abspath(__file__))
+goldendir = os.path.join(testdir, 'golden')
+
+# Every writer that can render a meeting.  PmWiki is left out, its
+# replacements() still uses the Python 2 unbound method __func__, and
+# so is template.html, which Genshi rejects as malformed.
+full_writer_map = {
+    '.log.txt':     writers.TextLog,
+    '.log.html':    writers.HTMLlog,
+    '.html':        writers.HTML,
+    '.rst':         writers.ReST,
+    '.rst.html':    writers.HTMLfromReST,
+    '.txt':         writers.Text,
+    '.mw':          writers.MediaWiki,
+    '.moin.txt':    writers.Moin,
+    '.tmp.txt|template=+template.txt':   writers.Template,
+}
+
+
+def render(contents, writer_map=full_writer_map):
+    """Replay a meeting log and return {extension: output} for it."""
+    M = meeting.Meeting(channel="#none", owner=None, filename='/dev/null',
+                        safeMode=False,
+                        extraConfig={'writer_map': writer_map},
+                        sendReply=lambda x: None,
+                        sendPrivateReply=lambda nick, x: None,
+                        setTopic=lambda x: None)
+    contents = "\n".join(line.strip() for line in contents.split("\n"))
+    M.process_meeting(contents, dontSave=True)
+    results = M.save()
+    for ext, text in results.items():
+        if isinstance(text, bytes):
+            results[ext] = text.decode('utf-8')
+    return results
+
+
+class OutputTest(unittest.TestCase):
+    nesting_contents = """
+    10:10:10 <x> #startmeeting
+    10:10:10 <x> #topic first topic
+    10:10:11 <x> #subtopic sub one
+    10:10:12 <x> #info in sub one
+    10:10:13 <x> #subtopic sub two
+    10:10:14 <x> #info in sub two
+    10:10:15 <x> #topic second topic
+    10:10:16 <x> #info in second topic
+    10:10:17 <x> #endmeeting
+    """
+
+    topic_contents = """
+    10:10:10 <x> #startmeeting
+    10:10:10 <x> #topic A & B <c> foo_ bar
+    10:10:10 <x> #endmeeting
+    """
+
+    def test_topic_escaped_once(self):
+        """Topics are escaped exactly once in every output format."""
+        results = render(self.topic_contents)
+        html = results['.html']
+        self.assertIn('A &amp; B &lt;c&gt;', html)
+        self.assertNotIn('&amp;amp;', html)
+        self.assertNotIn('&amp;lt;', html)
+        rst = results['.rst']
+        self.assertIn(r'A & B <c> foo\_ bar', rst)
+        self.assertNotIn(r'foo\\_', rst)
+        for ext in ('.txt', '.mw', '.moin.txt'):
+            self.assertIn('A & B <c> foo_ bar', results[ext], ext)
+
+    def assertGolden(self, name, results):
+        """Compare every output with tests/golden/<name><extension>.
+
+        Set MEETBOT_UPDATE_GOLDEN=1 to rewrite the golden files instead.
+        """
+        update = os.environ.get('MEETBOT_UPDATE_GOLDEN')
+        for ext, text in results.items():
+            filename = os.path.join(goldendir, name + ext.split('|')[0])
+            if update:
+                with open(filename, 'w') as f:
+                    f.write(text)
+                continue
+            with open(filename) as f:
+                expected = f.read()
+            with self.subTest(output=ext):
+                self.assertEqual(text, expected)
+
+    def test_script_1_golden(self):
+        """test-script-1 renders the same in every writer."""
+        with open(os.path.join(testdir, 'test-script-1.log.txt')) as f:
+            results = render(f.read())
+        self.assertEqual(set(results),
+                         {ext.split('|')[0] for ext in full_writer_map})
+        self.assertGolden('script-1', results)
+
+    def test_nesting_golden(self):
+        """Subtopics nest under their topic in every writer."""
+        # template.txt expects every item to have a line, which
+        # subtopics don't.
+        writer_map = {ext: writer for ext, writer in full_writer_map.items()
+                      if writer is not writers.Template}
+        self.assertGolden('nesting',
+                          render(self.nesting_contents, writer_map))
+
+    def test_nesting_html(self):
+        """Each subtopic's list is closed before the next one opens."""
+        html = render(self.nesting_contents,
+                      {'.html': writers.HTML})['.html']
+        summary = html[html.index('<ol class="summary">'):]
+        stack = []
+        for tag in re.findall(r'</?(?:ol|li)\b', summary):
+            if tag[1] != '/':
+                stack.append(tag[1:])
+                continue
+            self.assertEqual(stack.pop(), tag[2:])
+            if not stack:
+                break
+        self.assertEqual(stack, [])
+        # sub two is a sibling of sub one, not a child of it.
+        self.assertRegex(
+            summary, r'(?s)in sub one.*?</ol>\s*</li>\s*<li><b '
+                     r'class="SUBTOPIC">sub two')
+
+
+if __name__ == '__main__':
+    unittest.main()
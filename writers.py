@@ -30,6 +30,10 @@
 
 from __future__ import annotations
 
+import copy
+import functools
+import io
+import operator
 import os
 import re
 import time
@@ -45,14 +49,22 @@ if TYPE_CHECKING:
 
 def html(text: str):
     """Escape bad sequences (in HTML) in user-generated lines."""
+    # Chained str.replace is much faster here than str.translate.
     return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
 
 
+# Log lines repeat the same few nick fields over and over.
+htmlNick = functools.lru_cache(maxsize=1024)(html)
+
+
 rstReplaceRE = re.compile('_( |-|$)')
 
 
 def rst(text: str):
     """Escapes bad sequences in reST"""
+    # Most lines have no underscore at all; skip the regex for them.
+    if '_' not in text:
+        return text
     return rstReplaceRE.sub(r'\_\1', text)
 
 
@@ -76,22 +88,61 @@ class TextWrapper(textwrap.TextWrapper):
     wordsep_re = re.compile(r'(\s+)')
 
 
-def wrapList(item: str, indent: int = 0):
+@functools.lru_cache(maxsize=32)
+def listWrapper(indent: int = 0):
     return TextWrapper(width=72, initial_indent=' '*indent,
                        subsequent_indent=' '*(indent+2),
-                       break_long_words=False).fill(item)
+                       break_long_words=False)
+
+
+def wrapList(item: str, indent: int = 0):
+    # An item that already fits on one line comes back from fill()
+    # unchanged apart from the indent, unless it has whitespace that
+    # TextWrapper would replace or drop.
+    if (len(item) + indent <= 72 and item[-1:] not in ('', ' ') and
+            item.isprintable()):
+        return indentItem(item, indent)
+    return listWrapper(indent).fill(item)
+
+
+indents = [' '*i for i in range(16)]
 
 
 def indentItem(item: str, indent: int = 0):
+    if indent < 16:
+        return indents[indent] + item
     return ' '*indent + item
 
 
+wrapRE = re.compile(r'sWRAPs(.*?)eWRAPe', re.DOTALL)
+plainWrapper = TextWrapper(width=72, break_long_words=False)
+
+
+def fillWRAP(m: re.Match):
+    return plainWrapper.fill(m.group(1))
+
+
 def replaceWRAP(item: str):
-    re_wrap = re.compile(r'sWRAPs(.*)eWRAPe', re.DOTALL)
+    return wrapRE.sub(fillWRAP, item)
+
+
+wordRE = re.compile(r'\w+')
+
+
+@functools.lru_cache(maxsize=1024)
+def nickRE(nick: str):
+    """Return the (cached) pattern matching a line mentioning nick."""
+    return re.compile(r'\b%s\b' % re.escape(nick), re.I)
 
-    def repl(m):
-        return TextWrapper(width=72, break_long_words=False).fill(m.group(1))
-    return re_wrap.sub(repl, item)
+
+@functools.lru_cache(maxsize=64)
+def formatTimes(starttime: time.struct_time, endtime: time.struct_time):
+    """The start/end time strings used by the writers' replacements."""
+    return (time.strftime("%H:%M:%S", starttime),
+            time.strftime("%H:%M", starttime),
+            time.strftime("%d %b", starttime),
+            time.strftime("%H:%M:%S", endtime),
+            time.strftime("%H:%M", endtime))
 
 
 class _BaseWriter(object):
@@ -110,6 +161,11 @@ class _BaseWriter(object):
         """
         raise NotImplementedError
 
+    def escapeNicks(self, escape: Callable[[str], str]):
+        """Escape the nicks of all minute items for one output format."""
+        from .items import escapeNicks
+        escapeNicks(self.M.minutes, escape)
+
     @property
     def pagetitle(self):
         if self.M._meetingTopic:
@@ -120,13 +176,15 @@ class _BaseWriter(object):
         return "%s meeting" % self.M.channel
 
     def replacements(self):
+        (starttime, starttimeshort, startdate,
+         endtime, endtimeshort) = formatTimes(self.M.starttime, self.M.endtime)
         return {'pageTitle': self.pagetitle,
                 'owner': self.M.owner,
-                'starttime': time.strftime("%H:%M:%S", self.M.starttime),
-                'starttimeshort': time.strftime("%H:%M", self.M.starttime),
-                'startdate': time.strftime("%d %b", self.M.starttime),
-                'endtime': time.strftime("%H:%M:%S", self.M.endtime),
-                'endtimeshort': time.strftime("%H:%M", self.M.endtime),
+                'starttime': starttime,
+                'starttimeshort': starttimeshort,
+                'startdate': startdate,
+                'endtime': endtime,
+                'endtimeshort': endtimeshort,
                 'timeZone': self.M.config.timeZone,
                 'fullLogs': f"{self.M.config.basename}.log.html",
                 'fullLogsFullURL': f"{self.M.config.filename(url=True)}.log.html",
@@ -134,31 +192,75 @@ class _BaseWriter(object):
                 'MeetBotVersion': __version__,
                 }
 
+    def minutesOfType(self, itemtype: str) -> list:
+        """Return the minute items of one itemtype, in order.
+
+        All types are bucketed in a single pass over the minutes and
+        shared by the writers through M._minutesByType, which the
+        Meeting clears whenever an item is added or undone.
+        """
+        M = self.M
+        byType = M._minutesByType
+        if byType is None:
+            byType = M._minutesByType = {}
+            for m in M.minutes:
+                byType.setdefault(m.itemtype, []).append(m)
+        return byType.get(itemtype, [])
+
     def iterNickCounts(self):
-        nicks = [(n, c) for (n, c) in self.M.attendees.items()]
-        nicks.sort(key=lambda x: x[1], reverse=True)
-        return nicks
+        """The attendees and their line counts, most lines first.
+
+        Shared by all the writers of a meeting through M._nickCounts,
+        which Meeting.addnick clears.
+        """
+        M = self.M
+        nickCounts = M._nickCounts
+        if nickCounts is None:
+            nickCounts = M._nickCounts = sorted(
+                M.attendees.items(), key=operator.itemgetter(1), reverse=True)
+        return nickCounts
+
+    def sortedNicks(self) -> list:
+        """The attendees sorted case-insensitively.
+
+        Shared by all the writers of a meeting through M._sortedNicks,
+        which Meeting.addnick clears when a new nick shows up.
+        """
+        M = self.M
+        sortedNicks = M._sortedNicks
+        if sortedNicks is None:
+            sortedNicks = M._sortedNicks = sorted(M.attendees, key=str.lower)
+        return sortedNicks
 
     def iterActionItemsNick(self):
-        for nick in sorted(self.M.attendees.keys(), key=lambda x: x.lower()):
-            def nickitems():
-                for m in self.M.minutes:
-                    # The hack below is needed because of pickling problems
-                    if m.itemtype != "ACTION":
-                        continue
-                    if not re.match(r'.*\b%s\b.*' % re.escape(nick), m.line, re.I):
-                        continue
-                    m.assigned = True
-                    yield m
-            yield nick, nickitems()
+        """Yield (nick, action items mentioning nick) for every attendee.
+
+        Action lines are indexed by their words in one pass, so a nick
+        made only of word characters is a single lookup; other nicks
+        fall back to searching each line with nickRE.
+        """
+        actions = self.minutesOfType("ACTION")
+        byWord = {}
+        for m in actions:
+            for word in set(wordRE.findall(m.line.lower())):
+                byWord.setdefault(word, []).append(m)
+        # Items claimed by some nick, for iterActionItemsUnassigned.
+        assigned = self._assignedActions = set()
+        for nick in self.sortedNicks():
+            if wordRE.fullmatch(nick):
+                items = byWord.get(nick.lower(), [])
+            else:
+                nick_re = nickRE(nick)
+                items = [m for m in actions if nick_re.search(m.line)]
+            assigned.update(items)
+            yield nick, items
 
     def iterActionItemsUnassigned(self):
-        for m in self.M.minutes:
-            if m.itemtype != "ACTION":
-                continue
-            if getattr(m, 'assigned', False):
-                continue
-            yield m
+        """Yield the action items iterActionItemsNick gave to no nick."""
+        assigned = getattr(self, '_assignedActions', ())
+        for m in self.minutesOfType("ACTION"):
+            if m not in assigned:
+                yield m
 
     def get_template(self, escape: Callable = lambda s: s):
         M = self.M
@@ -210,9 +312,7 @@ class _BaseWriter(object):
         #              'url_quoteescaped': 'url' but with " escaped for use in
         #                                  <a href="$url_quoteescaped">
         ActionItems = []
-        for m in M.minutes:
-            if m.itemtype != "ACTION":
-                continue
+        for m in self.minutesOfType("ACTION"):
             ActionItems.append(escape(m.line))
         repl['ActionItems'] = ActionItems
         # Format of ActionItems: It's just a very simple list of lines.
@@ -278,6 +378,17 @@ class _BaseWriter(object):
         return repl
 
 
+# Parsed genshi templates, keyed on path, with their mtime and class.
+_templates = {}
+
+
+@functools.lru_cache(maxsize=None)
+def loadGenshiTemplate():
+    """Import genshi.template on first use; genshi is only needed here."""
+    import genshi.template
+    return genshi.template
+
+
 class Template(_BaseWriter):
     """Format a notes file using the genshi templating engine
 
@@ -309,20 +420,29 @@ class Template(_BaseWriter):
             raise IOError('File not found: %s' % template)
 
         # Do we want to use a text template or HTML ?
-        import genshi.template
+        genshiTemplate = loadGenshiTemplate()
         if template[-4:] in ('.txt', '.rst'):
-            Template = genshi.template.NewTextTemplate   # plain text
+            Template = genshiTemplate.NewTextTemplate   # plain text
         else:
-            Template = genshi.template.MarkupTemplate    # HTML-like
-
-        # Do the actual templating work
-        with open(template, 'r') as f:
-            tmpl = Template(f.read())
-            stream = tmpl.generate(**repl)
+            Template = genshiTemplate.MarkupTemplate    # HTML-like
+
+        # Do the actual templating work, reusing the parsed template
+        # until the file changes.
+        mtime = os.stat(template).st_mtime_ns
+        cached = _templates.get(template)
+        if cached is None or cached[:2] != (mtime, Template):
+            with open(template, 'r') as f:
+                cached = _templates[template] = (mtime, Template,
+                                                 Template(f.read()))
+        stream = cached[2].generate(**repl)
 
         return stream.render()
 
 
+# Contents of embedded stylesheets, keyed on path, with their mtime.
+_cssFiles = {}
+
+
 class _CSSmanager(object):
     _css_head = textwrap.dedent('''\
         <style type="text/css">
@@ -345,9 +465,12 @@ class _CSSmanager(object):
             # Stylesheet specified
             if getattr(self.M.config, f'cssEmbed_{name}', True):
                 # external stylesheet
-                with open(css_fname) as f:
-                    css = f.read()
-                return self._css_head % css
+                mtime = os.stat(css_fname).st_mtime_ns
+                cached = _cssFiles.get(css_fname)
+                if cached is None or cached[0] != mtime:
+                    with open(css_fname) as f:
+                        cached = _cssFiles[css_fname] = (mtime, f.read())
+                return self._css_head % cached[1]
             else:
                 # linked stylesheet
                 css_head = ('''<link rel="stylesheet" type="text/css" '''
@@ -379,83 +502,146 @@ class TextLog(_BaseWriter):
         return "\n".join(M.lines)
     update_realtime = True
 
+    def formatSince(self, linecount: int) -> str:
+        """What to append to a log written with the first `linecount` lines."""
+        new = self.M.lines[linecount:]
+        if not new:
+            return ""
+        if linecount:
+            return "\n" + "\n".join(new)
+        return "\n".join(new)
+
+
+# Patterns for the pieces of a raw log line, used by HTMLlog.
+logLineRE = re.compile(r"""\s*
+    (?P<time> \[?[0-9:\s]*\]?)\s*
+    (?P<nick>\s+<[@+\s]?[^>]+>)\s*
+    (?P<line>.*)
+""", re.VERBOSE)
+logActionRE = re.compile(r"""\s*
+    (?P<time> \[?[0-9:\s]*\]?)\s*
+    (?P<nick>\*\s+[@+\s]?[^\s]+)\s*
+    (?P<line>.*)
+""", re.VERBOSE)
+
+
+def splitLogLine(line: str):
+    """Split a raw log line into (isAction, time, nick, line).
+
+    Lines in the form Meeting.addrawline writes are split by hand, and
+    anything else falls back to logLineRE/logActionRE.  The pieces are
+    exactly what the patterns would capture.  None means the line is
+    neither a message nor an action.
+    """
+    time_, _, rest = line.partition(' ')
+    if time_ and not time_.strip('0123456789:'):
+        if rest[:1] == '<':
+            end = rest.find('>')
+            if end > 1:
+                return (False, time_, ' ' + rest[:end+1],
+                        rest[end+1:].lstrip())
+        elif rest[:2] == '* ' and rest[2:3] and not rest[2:3].isspace():
+            nick, *said = rest[2:].split(None, 1)
+            return True, time_ + ' ', '* ' + nick, said[0] if said else ''
+    m = logLineRE.match(line)
+    if m:
+        return (False,) + m.group('time', 'nick', 'line')
+    m = logActionRE.match(line)
+    if m:
+        return (True,) + m.group('time', 'nick', 'line')
+    return None
+
+
+def splitLogMarkup(line: str):
+    """Split the text of a log line into (kind, head, rest).
+
+    kind is 'topic' for '#topic ...', 'cmd' for other '#command ...'
+    lines and 'hi' for 'nick: ...' hilights.  head is the command with
+    its trailing blanks, or the hilighted nick with its colon.  None
+    means the line is plain text.
+    """
+    if line[:1] == '#':
+        if line[:6] == '#topic':
+            rest = line[6:].lstrip(' \t\f\v')
+            return 'topic', line[:len(line)-len(rest)], rest
+        command = line.split(None, 1)[0]
+        if len(command) > 1:
+            rest = line[len(command):].lstrip(' \t\f\v')
+            return 'cmd', line[:len(line)-len(rest)], rest
+    elif ':' in line and not line[0].isspace():
+        nick = line.split(None, 1)[0]
+        if (len(nick) > 1 and nick[-1] == ':' and
+                line[len(nick):len(nick)+1] == ' '):
+            return 'hi', nick, line[len(nick):]
+    return None
+
 
 class HTMLlog(_BaseWriter, _CSSmanager):
     def format(self, extension: str = None) -> str:
         """Write pretty HTML logs."""
         M = self.M
-        lines = []
-        line_re = re.compile(r"""\s*
-            (?P<time> \[?[0-9:\s]*\]?)\s*
-            (?P<nick>\s+<[@+\s]?[^>]+>)\s*
-            (?P<line>.*)
-        """, re.VERBOSE)
-        action_re = re.compile(r"""\s*
-            (?P<time> \[?[0-9:\s]*\]?)\s*
-            (?P<nick>\*\s+[@+\s]?[^\s]+)\s*
-            (?P<line>.*)
-        """, re.VERBOSE)
-        command_re = re.compile(r"(#[^\s]+[ \t\f\v]*)(.*)")
-        command_topic_re = re.compile(r"(#topic[ \t\f\v]*)(.*)")
-        hilight_re = re.compile(r"([^\s]+:)( .*)")
+        # Stream the lines into one buffer rather than keeping every
+        # fragment alive until a final join.
+        body = io.StringIO()
+        write = body.write
+        write("<pre>")
+        sep = ""
         lineNumber = 0
         for l in M.lines:
             lineNumber += 1  # starts from 1
+            parsed = splitLogLine(l)
+            if parsed is None:
+                print("**error**", l)
+                continue
+            # The time is only digits, colons, brackets and whitespace
+            # (see logLineRE/logActionRE), so it never needs escaping.
+            isAction, time_, nick, line = parsed
             # is it a regular line?
-            m = line_re.match(l)
-            if m:
-                line = m.group('line')
+            if not isAction:
+                markup = splitLogMarkup(line)
+                if markup is None:
+                    outline = html(line)
                 # Match #topic
-                m2 = command_topic_re.match(line)
-                if m2:
+                elif markup[0] == 'topic':
                     outline = ('<span class="topic">%s</span>'
                                '<span class="topicline">%s</span>' %
-                               (html(m2.group(1)), html(m2.group(2))))
+                               (html(markup[1]), html(markup[2])))
                 # Match other #commands
-                if not m2:
-                    m2 = command_re.match(line)
-                    if m2:
-                        outline = ('<span class="cmd">%s</span>'
-                                   '<span class="cmdline">%s</span>' %
-                                   (html(m2.group(1)), html(m2.group(2))))
+                elif markup[0] == 'cmd':
+                    outline = ('<span class="cmd">%s</span>'
+                               '<span class="cmdline">%s</span>' %
+                               (html(markup[1]), html(markup[2])))
                 # match hilights
-                if not m2:
-                    m2 = hilight_re.match(line)
-                    if m2:
-                        outline = ('<span class="hi">%s</span>' '%s' %
-                                   (html(m2.group(1)), html(m2.group(2))))
-                if not m2:
-                    outline = html(line)
-                lines.append('<a href="#l-%(lineno)s" name="l-%(lineno)s">'
-                             '<span class="tm">%(time)s</span></a>'
-                             '<span class="nk">%(nick)s</span> '
-                             '%(line)s' % {'lineno': lineNumber,
-                                           'time': html(m.group('time')),
-                                           'nick': html(m.group('nick')),
-                                           'line': outline,
-                                           })
-                continue
-            m = action_re.match(l)
+                else:
+                    outline = ('<span class="hi">%s</span>' '%s' %
+                               (html(markup[1]), html(markup[2])))
+                write(sep)
+                write('<a href="#l-%(lineno)s" name="l-%(lineno)s">'
+                      '<span class="tm">%(time)s</span></a>'
+                      '<span class="nk">%(nick)s</span> '
+                      '%(line)s' % {'lineno': lineNumber,
+                                    'time': time_,
+                                    'nick': htmlNick(nick),
+                                    'line': outline,
+                                    })
             # is it a action line?
-            if m:
-                lines.append('<a name="l-%(lineno)s"></a>'
-                             '<span class="tm">%(time)s</span>'
-                             '<span class="nka">%(nick)s</span> '
-                             '<span class="ac">%(line)s</span>' %
-                             {'lineno': lineNumber,
-                              'time': html(m.group('time')),
-                              'nick': html(m.group('nick')),
-                              'line': html(m.group('line')),
-                              })
-                continue
-            print(l)
-            print(m.groups())
-            print("**error**", l)
-
+            else:
+                write(sep)
+                write('<a name="l-%(lineno)s"></a>'
+                      '<span class="tm">%(time)s</span>'
+                      '<span class="nka">%(nick)s</span> '
+                      '<span class="ac">%(line)s</span>' %
+                      {'lineno': lineNumber,
+                       'time': time_,
+                       'nick': htmlNick(nick),
+                       'line': html(line),
+                       })
+            sep = "\n"
+
+        write("</pre>")
         css = self.getCSS(name='log')
         return html_template % {'pageTitle': "%s log" % html(M.channel),
-                                # 'body':"<br>\n".join(lines),
-                                'body': "<pre>"+("\n".join(lines))+"</pre>",
+                                'body': body.getvalue(),
                                 'headExtra': css,
                                 }
 
@@ -492,61 +678,46 @@ class HTML(_BaseWriter, _CSSmanager):
         MeetingItems.append(self.heading('Meeting summary'))
         MeetingItems.append('<ol class="summary">')
 
-        haveTopic = False
-        haveSubtopic = False
-        inSublist = False
-        inSubsublist = False
+        # Closing tags of the open elements, innermost last: the topic
+        # <li>, its <ol type="a">, a subtopic <li> and its <ol type="i">.
+        stack: list[str] = []
+
+        def closeTo(depth: int):
+            while len(stack) > depth:
+                MeetingItems.append(stack.pop())
+
+        def openTo(depth: int):
+            # Open the topic <li> and its <ol> when an item needs them.
+            if depth >= 1 and not stack:
+                MeetingItems.append(indentItem("<li>", 2))
+                stack.append(indentItem("</li>", 2))
+            if depth >= 2 and len(stack) < 2:
+                MeetingItems.append(indentItem('<ol type="a">', 4))
+                stack.append(indentItem("</ol>", 4))
+
+        self.escapeNicks(html)
         for m in M.minutes:
-            item = f"<li>{m.html(M)}"
+            item = f"<li>{m.render(M, 'html')}"
             if m.itemtype == "TOPIC":
-                if inSublist:
-                    MeetingItems.append(indentItem("</ol>", 4))
-                    inSublist = False
-                if haveSubtopic:
-                    if inSubsublist:
-                        MeetingItems.append(indentItem("</ol>", 8))
-                        inSubsublist = False
-                    MeetingItems.append(indentItem("</li>", 6))
-                    haveSubtopic = False
-                if haveTopic:
-                    MeetingItems.append(indentItem("</li>", 2))
+                closeTo(0)
+                stack.append(indentItem("</li>", 2))
                 item = wrapList(item, 2)
-                haveTopic = True
             elif m.itemtype == "SUBTOPIC":
-                if not inSublist:
-                    if not haveTopic:
-                        MeetingItems.append(indentItem("<li>", 2))
-                        haveTopic = True
-                    MeetingItems.append(indentItem('<ol type="a">', 4))
-                    inSublist = True
+                openTo(2)
+                closeTo(2)
+                stack.append(indentItem("</li>", 6))
                 item = wrapList(item, 6)
-                haveSubtopic = True
             else:
-                if not inSublist:
-                    if not haveTopic:
-                        MeetingItems.append(indentItem("<li>", 2))
-                        haveTopic = True
-                    MeetingItems.append(indentItem('<ol type="a">', 4))
-                    inSublist = True
-                if haveSubtopic:
-                    if not inSubsublist:
+                openTo(2)
+                if len(stack) >= 3:
+                    if len(stack) == 3:
                         MeetingItems.append(indentItem('<ol type="i">', 8))
-                        inSubsublist = True
+                        stack.append(indentItem("</ol>", 8))
                     item = wrapList(item, 10)+"</li>"
-                elif haveTopic:
-                    item = wrapList(item, 6)+"</li>"
                 else:
-                    item = wrapList(item, 2)+"</li>"
+                    item = wrapList(item, 6)+"</li>"
             MeetingItems.append(item)
-
-        if haveSubtopic:
-            if inSubsublist:
-                MeetingItems.append(indentItem("</ol>", 8))
-            MeetingItems.append(indentItem("</li>", 6))
-        if inSublist:
-            MeetingItems.append(indentItem("</ol>", 4))
-        if haveTopic:
-            MeetingItems.append(indentItem("</li>", 2))
+        closeTo(0)
 
         MeetingItems.append("</ol>")
         MeetingItems = "\n".join(MeetingItems)
@@ -556,9 +727,9 @@ class HTML(_BaseWriter, _CSSmanager):
         M = self.M
         # Votes
         Votes = []
+        voteLink = self.replacements()['fullLogs']
         # reversed to show the oldest first
         for v, (vsum, vline) in M.votes.items():
-            voteLink = "%(fullLogs)s" % self.replacements()
             Votes.append(wrapList("<li><a href='%s#%d'>%s</a>" %
                          (voteLink, vline, html(v)), 2))
             # differentiate denied votes somehow, strikethrough perhaps?
@@ -579,13 +750,9 @@ class HTML(_BaseWriter, _CSSmanager):
 
     def actionItems(self) -> str:
         """Return the 'Action items' block."""
-        M = self.M
         # Action Items
         ActionItems = []
-        for m in M.minutes:
-            # The hack below is needed because of pickling problems
-            if m.itemtype != "ACTION":
-                continue
+        for m in self.minutesOfType("ACTION"):
             ActionItems.append(wrapList("<li>%s</li>" % html(m.line), 2))
         if not ActionItems:
             return None
@@ -598,14 +765,16 @@ class HTML(_BaseWriter, _CSSmanager):
     def actionItemsPerson(self) -> str:
         """Return the 'Action items, by person' block."""
         M = self.M
-        # Action Items, by person (This could be made lots more efficient)
+        # Action Items, by person
+        if not self.minutesOfType("ACTION"):
+            return None
         ActionItemsPerson = []
         for nick, items in self.iterActionItemsNick():
             headerPrinted = False
             for m in items:
                 if not headerPrinted:
                     ActionItemsPerson.append(indentItem(
-                        '<li>%s<ol type="a">' % html(nick), 2))
+                        '<li>%s<ol type="a">' % htmlNick(nick), 2))
                     headerPrinted = True
                 ActionItemsPerson.append(
                     wrapList("<li>%s</li>" % html(m.line), 4))
@@ -630,13 +799,9 @@ class HTML(_BaseWriter, _CSSmanager):
         return ActionItemsPerson
 
     def doneItems(self) -> str:
-        M = self.M
         # Done Items
         DoneItems = []
-        for m in M.minutes:
-            # The hack below is needed because of pickling problems
-            if m.itemtype != "DONE":
-                continue
+        for m in self.minutesOfType("DONE"):
             # already escaped
             DoneItems.append(wrapList("<li>%s</li>" % html(m.line), 2))
         if not DoneItems:
@@ -656,13 +821,23 @@ class HTML(_BaseWriter, _CSSmanager):
         # sort by number of lines spoken
         for nick, count in self.iterNickCounts():
             PeoplePresent.append(indentItem(
-                '<li>%s (%d)</li>' % (html(nick), count), 2))
+                '<li>%s (%d)</li>' % (htmlNick(nick), count), 2))
         PeoplePresent.append('</ol>')
         PeoplePresent = "\n".join(PeoplePresent)
         return PeoplePresent
 
     def heading(self, name: str) -> str:
-        return '<h3>%s</h3>' % name
+        return f'<h3>{name}</h3>'
+
+    body_start = textwrap.dedent("""\
+            <h1>%(pageTitle)s</h1>
+            <div class="details">
+            Meeting started by %(owner)s at %(starttime)s %(timeZone)s
+            (<a href="%(fullLogs)s">full logs</a>)</div>""")
+    body_end = textwrap.dedent("""\
+            <div class="details">
+            Meeting ended at %(endtime)s %(timeZone)s
+            (<a href="%(fullLogs)s">full logs</a>)</div>""")
 
     def format(self, extension: str = None) -> str:
         """Write the minutes summary."""
@@ -671,25 +846,17 @@ class HTML(_BaseWriter, _CSSmanager):
         repl = self.replacements()
 
         body = []
-        body.append(textwrap.dedent("""\
-            <h1>%(pageTitle)s</h1>
-            <div class="details">
-            Meeting started by %(owner)s at %(starttime)s %(timeZone)s
-            (<a href="%(fullLogs)s">full logs</a>)</div>""" % repl))
+        body.append(self.body_start % repl)
         body.append(self.meetingItems())
-        body.append(textwrap.dedent("""\
-            <div class="details">
-            Meeting ended at %(endtime)s %(timeZone)s
-            (<a href="%(fullLogs)s">full logs</a>)</div>""" % repl))
+        body.append(self.body_end % repl)
         body.append(self.actionItems())
         body.append(self.actionItemsPerson())
         body.append(self.peoplePresent())
         body.append("""<div class="details">"""
                     """Generated by <a href="%(MeetBotInfoURL)s">MeetBot</a> """
                     """%(MeetBotVersion)s</div>""" % repl)
-        body = [b for b in body if b is not None]
+        body = [replaceWRAP(b) for b in body if b is not None]
         body = "\n\n\n\n".join(body)
-        body = replaceWRAP(body)
 
         css = self.getCSS(name='minutes')
         repl.update({'body': body,
@@ -760,8 +927,9 @@ class ReST(_BaseWriter):
         M.rst_urls = []
         M.rst_refs = {}
         haveTopic = False
+        self.escapeNicks(rst)
         for m in M.minutes:
-            item = "* "+m.rst(M)
+            item = "* "+m.render(M, 'rst')
             if m.itemtype == "TOPIC":
                 if haveTopic:
                     MeetingItems.append("")
@@ -774,16 +942,15 @@ class ReST(_BaseWriter):
                     item = wrapList(item, 0)
             MeetingItems.append(item)
         MeetingItems = "\n\n".join(MeetingItems)
-        MeetingURLs = "\n".join(M.rst_urls)
+        # rst_urls holds (rstref, link, anchor) tuples from makeRSTref()
+        MeetingURLs = "\n".join([f".. _{rstref}: {link}#{anchor}"
+                                 for rstref, link, anchor in M.rst_urls])
         del M.rst_urls, M.rst_refs
         MeetingItems += "\n\n"+MeetingURLs
 
         # Action Items
         ActionItems = []
-        for m in M.minutes:
-            # The hack below is needed because of pickling problems
-            if m.itemtype != "ACTION":
-                continue
+        for m in self.minutesOfType("ACTION"):
             # already escaped
             ActionItems.append(wrapList("* %s" % rst(m.line), 0))
         if not ActionItems:
@@ -792,29 +959,19 @@ class ReST(_BaseWriter):
 
         # Action Items, by person (This could be made lots more efficient)
         ActionItemsPerson = []
-        for nick in sorted(M.attendees.keys(), key=lambda x: x.lower()):
+        for nick, items in self.iterActionItemsNick():
             headerPrinted = False
-            for m in M.minutes:
-                # The hack below is needed because of pickling problems
-                if m.itemtype != "ACTION":
-                    continue
-                if not re.match(r'.*\b%s\b.*' % re.escape(nick), m.line, re.I):
-                    continue
+            for m in items:
                 if not headerPrinted:
                     ActionItemsPerson.append("* %s" % rst(nick))
                     headerPrinted = True
                 ActionItemsPerson.append(wrapList("* %s" % rst(m.line), 2))
-                m.assigned = True
         if not ActionItemsPerson:
             ActionItemsPerson.append("* (None)")
         else:
             # Unassigned items
             Unassigned = []
-            for m in M.minutes:
-                if m.itemtype != "ACTION":
-                    continue
-                if getattr(m, 'assigned', False):
-                    continue
+            for m in self.iterActionItemsUnassigned():
                 Unassigned.append(wrapList("* %s" % rst(m.line), 2))
             if Unassigned:
                 Unassigned.insert(0, "* **UNASSIGNED**")
@@ -842,15 +999,35 @@ class ReST(_BaseWriter):
         return body
 
 
+@functools.lru_cache(maxsize=4)
+def docutilsSettings(output_codec: str):
+    """Build the docutils settings for HTMLfromReST once per codec.
+
+    Setting up docutils' option parser is about a third of a
+    publish_string call for a typical meeting.
+    """
+    import docutils.core
+    publisher = docutils.core.Publisher()
+    publisher.set_components('standalone', 'restructuredtext', 'html')
+    return publisher.get_settings(file_insertion_enabled=0,
+                                  raw_enabled=0,
+                                  output_encoding=output_codec)
+
+
 class HTMLfromReST(_BaseWriter):
     def format(self, extension: str = None):
         M = self.M
         import docutils.core
-        rst = ReST(M).format(extension)
+        # Keep one ReST writer, and its caches, for the whole meeting.
+        rstWriter = getattr(self, '_rstWriter', None)
+        if rstWriter is None:
+            rstWriter = self._rstWriter = ReST(M)
+        rst = rstWriter.format(extension)
+        # publish_string records per-document state on the settings, so
+        # each call gets its own copy.
+        settings = copy.copy(docutilsSettings(self.M.config.output_codec))
         rstToHTML = docutils.core.publish_string(rst, writer_name='html',
-                                                 settings_overrides={'file_insertion_enabled': 0,
-                                                                     'raw_enabled': 0,
-                                                                     'output_encoding': self.M.config.output_codec})
+                                                 settings=settings)
         return rstToHTML
 
 
@@ -861,8 +1038,9 @@ class Text(_BaseWriter):
         MeetingItems = []
         MeetingItems.append(self.heading('Meeting summary'))
         haveTopic = False
+        self.escapeNicks(text)
         for m in M.minutes:
-            item = "* "+m.text(M)
+            item = "* "+m.render(M, 'text')
             if m.itemtype == "TOPIC":
                 if haveTopic:
                     MeetingItems.append("")
@@ -878,13 +1056,9 @@ class Text(_BaseWriter):
         return MeetingItems
 
     def actionItems(self) -> str:
-        M = self.M
         # Action Items
         ActionItems = []
-        for m in M.minutes:
-            # The hack below is needed because of pickling problems
-            if m.itemtype != "ACTION":
-                continue
+        for m in self.minutesOfType("ACTION"):
             # already escaped
             ActionItems.append(wrapList("* %s" % text(m.line), 0))
         if not ActionItems:
@@ -894,32 +1068,23 @@ class Text(_BaseWriter):
         return ActionItems
 
     def actionItemsPerson(self) -> str:
-        M = self.M
-        # Action Items, by person (This could be made lots more efficient)
+        # Action Items, by person
+        if not self.minutesOfType("ACTION"):
+            return None
         ActionItemsPerson = []
-        for nick in sorted(M.attendees.keys(), key=lambda x: x.lower()):
+        for nick, items in self.iterActionItemsNick():
             headerPrinted = False
-            for m in M.minutes:
-                # The hack below is needed because of pickling problems
-                if m.itemtype != "ACTION":
-                    continue
-                if not re.match(r'.*\b%s\b.*' % re.escape(nick), m.line, re.I):
-                    continue
+            for m in items:
                 if not headerPrinted:
                     ActionItemsPerson.append("* %s" % text(nick))
                     headerPrinted = True
                 ActionItemsPerson.append(wrapList("* %s" % text(m.line), 2))
-                m.assigned = True
         if not ActionItemsPerson:
             return None
 
         # Unassigned items
         Unassigned = []
-        for m in M.minutes:
-            if m.itemtype != "ACTION":
-                continue
-            if getattr(m, 'assigned', False):
-                continue
+        for m in self.iterActionItemsUnassigned():
             Unassigned.append(wrapList("* %s" % text(m.line), 2))
         if Unassigned:
             Unassigned.insert(0, "* **UNASSIGNED**")
@@ -941,7 +1106,19 @@ class Text(_BaseWriter):
         return PeoplePresent
 
     def heading(self, name: str) -> str:
-        return '%s\n%s\n' % (name, '-'*len(name))
+        return f"{name}\n{'-'*len(name)}\n"
+
+    body_start = textwrap.dedent("""\
+            %(titleBlock)s
+            %(pageTitle)s
+            %(titleBlock)s
+
+
+            sWRAPsMeeting started by %(owner)s at %(starttime)s
+            %(timeZone)s.  The full logs are available at
+            %(fullLogsFullURL)seWRAPe""")
+    body_end = "Meeting ended at %(endtime)s %(timeZone)s."
+    body_footer = "Generated by MeetBot %(MeetBotVersion)s (%(MeetBotInfoURL)s)"
 
     def format(self, extension: str = None) -> str:
         """Return a plain text minutes summary."""
@@ -953,23 +1130,13 @@ class Text(_BaseWriter):
                      })
 
         body = []
-        body.append(textwrap.dedent("""\
-            %(titleBlock)s
-            %(pageTitle)s
-            %(titleBlock)s
-
-
-            sWRAPsMeeting started by %(owner)s at %(starttime)s
-            %(timeZone)s.  The full logs are available at
-            %(fullLogsFullURL)seWRAPe""" % repl))
+        body.append(self.body_start % repl)
         body.append(self.meetingItems())
-        body.append(textwrap.dedent("""\
-            Meeting ended at %(endtime)s %(timeZone)s.""" % repl))
+        body.append(self.body_end % repl)
         body.append(self.actionItems())
         body.append(self.actionItemsPerson())
         body.append(self.peoplePresent())
-        body.append(textwrap.dedent("""\
-            Generated by MeetBot %(MeetBotVersion)s (%(MeetBotInfoURL)s)""" % repl))
+        body.append(self.body_footer % repl)
         body = [b for b in body if b is not None]
         body = "\n\n\n\n".join(body)
         body = replaceWRAP(body)
@@ -986,8 +1153,9 @@ class MediaWiki(_BaseWriter):
         MeetingItems = []
         MeetingItems.append(self.heading('Meeting summary'))
         haveTopic = False
+        self.escapeNicks(mw)
         for m in M.minutes:
-            item = "* "+m.mw(M)
+            item = "* "+m.render(M, 'mw')
             if m.itemtype == "TOPIC":
                 if haveTopic:
                     MeetingItems.append("")
@@ -1000,13 +1168,9 @@ class MediaWiki(_BaseWriter):
         return MeetingItems
 
     def actionItems(self) -> str:
-        M = self.M
         # Action Items
         ActionItems = []
-        for m in M.minutes:
-            # The hack below is needed because of pickling problems
-            if m.itemtype != "ACTION":
-                continue
+        for m in self.minutesOfType("ACTION"):
             # already escaped
             ActionItems.append("* %s" % mw(m.line))
         if not ActionItems:
@@ -1016,34 +1180,25 @@ class MediaWiki(_BaseWriter):
         return ActionItems
 
     def actionItemsPerson(self) -> str:
-        M = self.M
-        # Action Items, by person (This could be made lots more efficient)
+        # Action Items, by person
+        if not self.minutesOfType("ACTION"):
+            return None
         ActionItemsPerson = []
         numberAssigned = 0
-        for nick in sorted(M.attendees.keys(), key=lambda x: x.lower()):
+        for nick, items in self.iterActionItemsNick():
             headerPrinted = False
-            for m in M.minutes:
-                # The hack below is needed because of pickling problems
-                if m.itemtype != "ACTION":
-                    continue
-                if not re.match(r'.*\b%s\b.*' % re.escape(nick), m.line, re.I):
-                    continue
+            for m in items:
                 if not headerPrinted:
                     ActionItemsPerson.append("* %s" % mw(nick))
                     headerPrinted = True
                 ActionItemsPerson.append("** %s" % mw(m.line))
                 numberAssigned += 1
-                m.assigned = True
         if not ActionItemsPerson:
             return None
 
         # Unassigned items
         Unassigned = []
-        for m in M.minutes:
-            if m.itemtype != "ACTION":
-                continue
-            if getattr(m, 'assigned', False):
-                continue
+        for m in self.iterActionItemsUnassigned():
             Unassigned.append("** %s" % mw(m.line))
         if Unassigned:
             Unassigned.insert(0, "* **UNASSIGNED**")
@@ -1065,7 +1220,8 @@ class MediaWiki(_BaseWriter):
         return PeoplePresent
 
     def heading(self, name: str, level: int = 1) -> str:
-        return '%s %s %s\n' % ('='*(level+1), name, '='*(level+1))
+        marker = '='*(level+1)
+        return f'{marker} {name} {marker}\n'
 
     body_start = textwrap.dedent("""\
             %(pageTitleHeading)s
@@ -1073,6 +1229,8 @@ class MediaWiki(_BaseWriter):
             sWRAPsMeeting started by %(owner)s at %(starttime)s
             %(timeZone)s.  The full logs are available at
             %(fullLogsFullURL)seWRAPe""")
+    body_end = "Meeting ended at %(endtime)s %(timeZone)s."
+    body_footer = "Generated by MeetBot %(MeetBotVersion)s (%(MeetBotInfoURL)s)"
 
     def format(self, extension: str = None) -> str:
         """Return a MediaWiki formatted minutes summary."""
@@ -1087,13 +1245,11 @@ class MediaWiki(_BaseWriter):
         body = []
         body.append(self.body_start % repl)
         body.append(self.meetingItems())
-        body.append(textwrap.dedent("""\
-            Meeting ended at %(endtime)s %(timeZone)s.""" % repl))
+        body.append(self.body_end % repl)
         body.append(self.actionItems())
         body.append(self.actionItemsPerson())
         body.append(self.peoplePresent())
-        body.append(textwrap.dedent("""\
-            Generated by MeetBot %(MeetBotVersion)s (%(MeetBotInfoURL)s)""" % repl))
+        body.append(self.body_footer % repl)
         body = [b for b in body if b is not None]
         body = "\n\n\n\n".join(body)
         body = replaceWRAP(body)
@@ -1103,7 +1259,7 @@ class MediaWiki(_BaseWriter):
 
 class PmWiki(MediaWiki, object):
     def heading(self, name: str, level: int = 1) -> str:
-        return '%s %s\n' % ('!'*(level+1), name)
+        return f"{'!'*(level+1)} {name}\n"
 
     def replacements(self) -> dict[str, Any]:
         # repl = super(PmWiki, self).replacements(self) # fails, type checking
@@ -1122,8 +1278,9 @@ class Moin(_BaseWriter):
         MeetingItems.append(self.heading('Meeting summary'))
         haveTopic = False
         haveSubtopic = False
+        self.escapeNicks(moin)
         for m in M.minutes:
-            item = m.moin(M)
+            item = m.render(M, 'moin')
             if m.itemtype == "TOPIC":
                 if haveSubtopic:
                     haveSubtopic = False
@@ -1146,20 +1303,22 @@ class Moin(_BaseWriter):
 
     def fullLog(self) -> str:
         M = self.M
-        Lines = []
-        Lines.append(self.heading('Full log'))
-        for l in M.lines:
-            Lines.append(' '+l)
+        Lines = [self.heading('Full log')]
+        Lines.extend([' '+l for l in M.lines])
         Lines = "\n\n".join(Lines)
         return Lines
 
-    def votes(self):
+    def votes(self, repl: dict[str, Any] = None):
         M = self.M
+        if not M.votes:
+            return None
         # Votes
         Votes = []
+        if repl is None:
+            repl = self.replacements()
+        voteLink = repl['fullLogsFullURL']
         # reversed to show the oldest first
         for v, (vsum, vline) in M.votes.items():
-            voteLink = "%(fullLogsFullURL)s" % self.replacements()
             Votes.append(" * [[%s#%d|%s]]" % (voteLink, vline, v))
             # differentiate denied votes somehow, strikethrough perhaps?
             Votes.append("  * " + vsum)
@@ -1173,13 +1332,9 @@ class Moin(_BaseWriter):
         return Votes
 
     def actionItems(self) -> str:
-        M = self.M
         # Action Items
         ActionItems = []
-        for m in M.minutes:
-            # The hack below is needed because of pickling problems
-            if m.itemtype != "ACTION":
-                continue
+        for m in self.minutesOfType("ACTION"):
             # already escaped
             ActionItems.append(" * %s" % moin(m.line))
         if not ActionItems:
@@ -1189,32 +1344,23 @@ class Moin(_BaseWriter):
         return ActionItems
 
     def actionItemsPerson(self) -> str:
-        M = self.M
-        # Action Items, by person (This could be made lots more efficient)
+        # Action Items, by person
+        if not self.minutesOfType("ACTION"):
+            return None
         ActionItemsPerson = []
-        for nick in sorted(M.attendees.keys(), key=lambda x: x.lower()):
+        for nick, items in self.iterActionItemsNick():
             headerPrinted = False
-            for m in M.minutes:
-                # The hack below is needed because of pickling problems
-                if m.itemtype != "ACTION":
-                    continue
-                if not re.match(r'.*\b%s\b.*' % re.escape(nick), m.line, re.I):
-                    continue
+            for m in items:
                 if not headerPrinted:
                     ActionItemsPerson.append(" * %s" % moin(nick))
                     headerPrinted = True
                 ActionItemsPerson.append("  * %s" % moin(m.line))
-                m.assigned = True
         if not ActionItemsPerson:
             return None
 
         # Unassigned items
         Unassigned = []
-        for m in M.minutes:
-            if m.itemtype != "ACTION":
-                continue
-            if getattr(m, 'assigned', False):
-                continue
+        for m in self.iterActionItemsUnassigned():
             Unassigned.append("  * %s" % moin(m.line))
         if Unassigned:
             Unassigned.insert(0, " * **UNASSIGNED**")
@@ -1225,13 +1371,9 @@ class Moin(_BaseWriter):
         return ActionItemsPerson
 
     def doneItems(self) -> str:
-        M = self.M
         # Done Items
         DoneItems = []
-        for m in M.minutes:
-            # The hack below is needed because of pickling problems
-            if m.itemtype != "DONE":
-                continue
+        for m in self.minutesOfType("DONE"):
             # already escaped
             DoneItems.append(" * %s" % moin(m.line))
         if not DoneItems:
@@ -1252,13 +1394,15 @@ class Moin(_BaseWriter):
         return PeoplePresent
 
     def heading(self, name, level=1):
-        return '%s %s %s\n' % ('='*(level+1), name, '='*(level+1))
+        marker = '='*(level+1)
+        return f'{marker} {name} {marker}\n'
 
     body_start = textwrap.dedent("""\
             == Meeting information ==
 
              * %(pageTitleHeading)s, started by %(owner)s, %(startdate)s at %(starttimeshort)s &mdash; %(endtimeshort)s %(timeZone)s.
              * Full logs at %(fullLogsFullURL)s""")
+    body_footer = "Generated by MeetBot %(MeetBotVersion)s (%(MeetBotInfoURL)s)"
 
     def format(self, extension: str = None) -> str:
         """Return a MoinMoin formatted minutes summary."""
@@ -1273,14 +1417,13 @@ class Moin(_BaseWriter):
         body = []
         body.append(self.body_start % repl)
         body.append(self.meetingItems())
-        body.append(self.votes())
+        body.append(self.votes(repl))
         body.append(self.actionItemsPerson())
         body.append(self.doneItems())
         body.append(self.peoplePresent())
         if M.config.moinFullLogs:
             body.append(self.fullLog())
-        body.append(textwrap.dedent("""\
-            Generated by MeetBot %(MeetBotVersion)s (%(MeetBotInfoURL)s)""" % repl))
+        body.append(self.body_footer % repl)
         body = [b for b in body if b is not None]
         body = "\n\n\n\n".join(body)
         body = replaceWRAP(body)